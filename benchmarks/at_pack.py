@@ -0,0 +1,34 @@
+'''
+Compares the generated ATCommand._pack with the generic implementation.
+
+Usage: python benchmarks/at_pack.py
+'''
+
+import timeit
+
+from pyardrone import at
+
+
+commands = [
+    at.PCMD(at.PCMD.flag.progressive, 0.1, -0.2, 0.3, 0),
+    at.REF(at.REF.input.start),
+    at.COMWDG(),
+    at.CONFIG('general:navdata_demo', True),
+]
+
+
+def main(number=100000):
+    print('{:>8} {:>12} {:>12} {:>8}'.format(
+        'command', 'generic', 'compiled', 'speedup'))
+    for command in commands:
+        assert command._pack(1) == command._pack_generic(1)
+        generic, compiled = (
+            timeit.timeit(lambda: pack(1), number=number) / number * 1e6
+            for pack in (command._pack_generic, command._pack)
+        )
+        print('{:>8} {:>10.2f}us {:>10.2f}us {:>7.1f}x'.format(
+            type(command).__name__, generic, compiled, generic / compiled))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+'''
+Compares the navdata checksum implementations.
+
+Usage: python benchmarks/checksum.py
+'''
+
+import os
+import timeit
+
+from pyardrone import navdata
+from pyardrone.utils.structure import NUMPY
+
+
+def naive(buffer):
+    return sum(buffer) & 0xffffffff
+
+
+implementations = [
+    ('sum()', naive),
+    ('int', navdata._compute_checksum_int),
+]
+if NUMPY:
+    implementations.append(('numpy', navdata._compute_checksum_numpy))
+
+
+def main(number=2000):
+    print('{:>6} {:>12} {:>12} {:>8}'.format(
+        'size', 'method', 'usec/call', 'speedup'))
+    for size in (256, 1024, 2048, 4088):
+        buffer = memoryview(os.urandom(size))
+        baseline = None
+        for name, function in implementations:
+            assert function(buffer) == naive(buffer)
+            usec = timeit.timeit(
+                lambda: function(buffer), number=number) / number * 1e6
+            if baseline is None:
+                baseline = usec
+            print('{:>6} {:>12} {:>12.2f} {:>7.1f}x'.format(
+                size, name, usec, baseline / usec))
+
+
+if __name__ == '__main__':
+    main()
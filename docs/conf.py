@@ -24,6 +24,14 @@ except ImportError:
     sys.modules['cv2'] = types.ModuleType('cv2')
     import cv2
 
+# the recorder requires numpy; mock it for autodoc if it is not installed.
+# pyardrone itself is imported below, before autodoc mocks anything, so that
+# it is still documented as without numpy.
+try:
+    import numpy
+except ImportError:
+    autodoc_mock_imports = ['numpy']
+
 # If extensions (or modules to document with autodoc) are in another directory,
 # add these directories to sys.path here. If the directory is relative to the
 # documentation root, use os.path.abspath to make it absolute, like shown here.
@@ -43,7 +51,10 @@ extensions = [
     'sphinx.ext.viewcode',
 ]
 
-intersphinx_mapping = {'python': ('https://docs.python.org/3', None)}
+intersphinx_mapping = {
+    'python': ('https://docs.python.org/3', None),
+    'numpy': ('https://numpy.org/doc/stable', None),
+}
 
 # Add any paths that contain templates here, relative to this directory.
 templates_path = ['_templates']
@@ -7,11 +7,12 @@ logging.basicConfig(level=logging.DEBUG)
 
 
 client = ARDrone()
-client.video_ready.wait()
 try:
-    while True:
-        cv2.imshow('im', client.frame)
-        if cv2.waitKey(10) == ord(' '):
-            break
+    # each frame is shown once, skipping the ones the loop is too slow for
+    with client.subscribe_frames(maxsize=1) as frames:
+        for frame in frames:
+            cv2.imshow('im', frame.image)
+            if cv2.waitKey(10) == ord(' '):
+                break
 finally:
     client.close()
@@ -5,18 +5,17 @@ from pyardrone.navdata.states import DroneState
 from pyardrone.utils import logging
 from pyardrone.abc import BaseClient
 
-# import VideoMixin only if opencv is available
-try:
-    import cv2
-except ImportError:
+from pyardrone.video import AV, OPENCV
+
+# use VideoMixin only if a video decoder is available
+if AV or OPENCV:
+    from pyardrone.video import VideoMixin
+    VIDEO = True
+else:
     class DummyVideoMixin:
         pass
     VideoMixin = DummyVideoMixin
     VIDEO = False
-else:
-    del cv2
-    from pyardrone.video import VideoMixin
-    VIDEO = True
 
 
 __version__ = '0.6.1'
@@ -29,6 +28,8 @@ logger = logging.getLogger(__name__)
 
 class ARDroneBase(BaseClient):
 
+    _state_cache = None, None
+
     def __init__(
         self,
         *,
@@ -39,6 +40,12 @@ class ARDroneBase(BaseClient):
         watchdog_interval=0.5,
         timeout=0.01,
         bind=True,
+        zero_copy=False,
+        lazy=False,
+        verify_checksum=True,
+        drain=False,
+        latest_only=False,
+        track_sequence=True,
         connect=True
     ):
         self.host = host
@@ -48,6 +55,12 @@ class ARDroneBase(BaseClient):
         self.watchdog_interval = watchdog_interval
         self.timeout = timeout
         self.bind = bind
+        self.zero_copy = zero_copy
+        self.lazy = lazy
+        self.verify_checksum = verify_checksum
+        self.drain = drain
+        self.latest_only = latest_only
+        self.track_sequence = track_sequence
 
         if connect:
             self.connect()
@@ -68,13 +81,42 @@ class ARDroneBase(BaseClient):
 
         See :py:class:`~pyardrone.navdata.states.DroneState`
         for the full list of states.
+
+        The state is decoded once per navdata.
         '''
-        return DroneState(self.navdata.metadata.state)
+        navdata = self.navdata
+        cached_navdata, state = self._state_cache
+        if cached_navdata is not navdata:
+            state = DroneState(navdata.metadata.state)
+            self._state_cache = navdata, state
+        return state
 
     @property
     def navdata_ready(self):
         return self.navdata_client.navdata_ready
 
+    def wait_next(self, timeout=None):
+        '''
+        Blocks until the next navdata is received and returns it, or
+        returns ``None`` after *timeout* seconds.
+        '''
+        return self.navdata_client.wait_next(timeout)
+
+    def wait_for(self, predicate, timeout=None):
+        '''
+        Blocks until *predicate* called with the latest
+        :py:class:`~pyardrone.navdata.NavData` returns true, and returns
+        that navdata, or returns ``None`` after *timeout* seconds:
+
+            >>> def flying(navdata):
+            ...     return DroneState(navdata.metadata.state).fly_mask
+            >>> drone.takeoff()
+            >>> drone.wait_for(flying, timeout=5)
+
+        See :py:meth:`pyardrone.navdata.NavDataClient.wait_for`.
+        '''
+        return self.navdata_client.wait_for(predicate, timeout)
+
     def send(self, command):
         '''
         :param ~pyardrone.at.base.ATCommand command: command to send
@@ -85,9 +127,30 @@ class ARDroneBase(BaseClient):
         '''
         self.at_client.send(command)
 
+    def batch(self):
+        '''
+        Returns a context manager which coalesces the commands sent by the
+        current thread within it into as few datagrams as possible:
+
+            >>> with drone.batch():
+            ...     drone.move(forward=0.5)
+            ...     drone.send(at.CONFIG('control:altitude_max', 3000))
+
+        See :py:meth:`pyardrone.at.ATClient.batch`.
+        '''
+        return self.at_client.batch()
+
     def _connect(self):
         self.at_client = ATClient(self.host, self.at_port)
-        self.navdata_client = NavDataClient(self.host, self.navdata_port)
+        self.navdata_client = NavDataClient(
+            self.host, self.navdata_port,
+            zero_copy=self.zero_copy,
+            lazy=self.lazy,
+            verify_checksum=self.verify_checksum,
+            drain=self.drain,
+            latest_only=self.latest_only,
+            track_sequence=self.track_sequence,
+        )
         self.at_client.connect()
         self.navdata_client.connect()
 
@@ -3,6 +3,7 @@ from pyardrone.at.base import ATCommand
 from pyardrone.at import parameters
 from pyardrone.abc import BaseClient
 
+import contextlib
 import threading
 import socket
 
@@ -163,10 +164,53 @@ class CTRL(ATCommand):
     zero = parameters.Int32(default=0)
 
 
+class BatchScope:
+
+    '''
+    Collects the items sent by the current thread while a batch is open,
+    see :py:meth:`ATClient.batch`.
+    '''
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def current(self):
+        '''
+        The list of items of the open batch, or ``None``.
+        '''
+        return getattr(self._local, 'batch', None)
+
+    def _set_current(self, batch):
+        self._local.batch = batch
+
+    @contextlib.contextmanager
+    def collect(self, flush):
+        '''
+        Opens a batch, and calls *flush* with the list of its items when it
+        is closed. Nested batches are merged into the outermost one.
+        '''
+        if self.current is not None:
+            yield
+            return
+        batch = []
+        self._set_current(batch)
+        try:
+            yield
+        finally:
+            self._set_current(None)
+            if batch:
+                flush(batch)
+
+
 class ATClient(BaseClient):
 
     connected = False
 
+    #: maximum size of a datagram of batched commands, as AT commands are
+    #: limited to 1024 characters per packet
+    max_packet_size = 1024
+
     def __init__(
         self,
         host='192.168.1.1',
@@ -179,6 +223,7 @@ class ATClient(BaseClient):
         self.watchdog_interval = watchdog_interval
         self.log_comwdg = log_comwdg
         self._closed = threading.Event()
+        self._batches = BatchScope()
 
     @property
     def closed(self):
@@ -217,10 +262,44 @@ class ATClient(BaseClient):
         with an internal increasing sequence number.
         this method is thread-safe.
         '''
+        batch = self._batches.current
+        if batch is not None:
+            batch.append((command, log))
+        else:
+            self._send_commands([(command, log)])
+
+    def batch(self):
+        '''
+        Returns a context manager which coalesces the commands sent by the
+        current thread within it, and sends them in as few datagrams as
+        possible when it exits:
+
+            >>> with client.batch():
+            ...     client.send(at.PCMD(at.PCMD.flag.progressive, gaz=0.5))
+            ...     client.send(at.CONFIG('control:altitude_max', 3000))
+
+        Sequence numbers are assigned in order when the batch is sent.
+        Nested batches are merged into the outermost one.
+        '''
+        return self._batches.collect(self._send_commands)
+
+    def _send_commands(self, commands):
         with self.sequence_number_mutex:
+            self._pack_and_send(commands)
+
+    def _pack_and_send(self, commands):
+        packet = b''
+        log = False
+        for command, command_log in commands:
             self.sequence_number += 1
             packed = command._pack(self.sequence_number)
-            self.send_bytes(packed, log=log)
+            if len(packet) + len(packed) > self.max_packet_size and packet:
+                self.send_bytes(packet, log=log)
+                packet = b''
+                log = False
+            packet += packed
+            log = log or command_log
+        self.send_bytes(packet, log=log)
 
     def _watchdog_job(self):
         while not self.closed:
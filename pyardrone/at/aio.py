@@ -0,0 +1,83 @@
+'''
+asyncio support for AT commands.
+'''
+
+import asyncio
+import contextvars
+import socket
+
+from pyardrone.at import ATClient, BatchScope, COMWDG
+from pyardrone.utils import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class ContextBatchScope(BatchScope):
+
+    '''
+    A :py:class:`~pyardrone.at.BatchScope` keeping the open batch in a
+    :py:class:`contextvars.ContextVar`, so that each asyncio task has its own.
+    '''
+
+    def __init__(self):
+        self._batch = contextvars.ContextVar('batch', default=(None, None))
+
+    @property
+    def current(self):
+        # tasks created inside a batch inherit the variable, but do not join
+        # the batch, which may be sent before they are done
+        owner, batch = self._batch.get()
+        if owner is not asyncio.current_task():
+            return None
+        return batch
+
+    def _set_current(self, batch):
+        self._batch.set((asyncio.current_task(), batch))
+
+
+class AsyncATClient(ATClient):
+
+    '''
+    An :py:class:`~pyardrone.at.ATClient` running on an asyncio event loop.
+
+    The :py:class:`~pyardrone.at.COMWDG` keep-alive is sent by a task
+    scheduled on the loop instead of a thread.
+    :py:meth:`~pyardrone.at.ATClient.send` does not take a lock and is not
+    thread-safe; it, :py:meth:`~pyardrone.abc.BaseClient.connect` and
+    :py:meth:`~pyardrone.abc.BaseClient.close` have to be called from the
+    event loop.
+
+    :py:meth:`~pyardrone.at.ATClient.batch` coalesces the commands sent by
+    the current task; commands sent by other tasks, including the watchdog,
+    are not delayed while a task awaits inside a batch.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._batches = ContextBatchScope()
+
+    def _connect(self):
+        self.sequence_number = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self._watchdog = asyncio.get_running_loop().create_task(
+            self._watchdog_job())
+
+    def _close(self):
+        self._watchdog.cancel()
+        self.sock.close()
+
+    def send_bytes(self, bytez, *, log=True):
+        try:
+            super().send_bytes(bytez, log=log)
+        except BlockingIOError:
+            logger.warning('socket buffer full, dropped: {!r}', bytez)
+
+    def _send_commands(self, commands):
+        self._pack_and_send(commands)
+
+    async def _watchdog_job(self):
+        while not self.closed:
+            self.send(COMWDG(), log=self.log_comwdg)
+            await asyncio.sleep(self.watchdog_interval)
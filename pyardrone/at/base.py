@@ -1,5 +1,50 @@
 import collections
-from pyardrone.at.parameters import Parameter
+import struct
+
+from pyardrone.at.parameters import Float, Int32, Parameter
+
+
+def _compile_pack(class_name, params):
+    '''
+    Generates a specialised ``_pack`` method for an ATCommand class with
+    parameters *params*, equivalent to :py:meth:`ATCommand._pack_generic`.
+
+    The command prefix is formatted only once, Int32 values are formatted
+    with ``%d``, and all Float values of a command are reinterpreted as
+    integers with a single pair of precompiled :py:class:`struct.Struct`.
+    '''
+    namespace = {}
+    template = ['AT*{}=%s'.format(class_name)]
+    args = ['seq']
+    floats = []
+    for index, param in enumerate(params):
+        if param._pack is Int32._pack:
+            template.append(',%d')
+            args.append('self[{}]'.format(index))
+        elif param._pack is Float._pack:
+            template.append(',%d')
+            args.append('_ints[{}]'.format(len(floats)))
+            floats.append('self[{}]'.format(index))
+        else:
+            template.append(',%s')
+            namespace['_pack_{}'.format(index)] = param._pack
+            args.append('_pack_{0}(self[{0}]).decode()'.format(index))
+    template.append('\r')
+    namespace['_template'] = ''.join(template)
+
+    source = ['def _pack(self, seq=\'SEQUNSET\'):']
+    if floats:
+        namespace['_float_struct'] = struct.Struct('{}f'.format(len(floats)))
+        namespace['_int_struct'] = struct.Struct('{}i'.format(len(floats)))
+        source.append(
+            '    _ints = _int_struct.unpack(_float_struct.pack({}))'.format(
+                ', '.join(floats)))
+    source.append('    return (_template % ({},)).encode()'.format(
+        ', '.join(args)))
+    exec('\n'.join(source), namespace)
+    function = namespace['_pack']
+    function.__qualname__ = '{}._pack'.format(class_name)
+    return function
 
 
 class ATCommandMeta(type):
@@ -9,7 +54,7 @@ class ATCommandMeta(type):
         return collections.OrderedDict()
 
     def __new__(cls, name, bases, namespace):
-        parameters = namespace.setdefault('_parameters', list())
+        params = namespace.setdefault('_parameters', list())
 
         param_index = 0
 
@@ -17,12 +62,17 @@ class ATCommandMeta(type):
             if isinstance(value, Parameter):
                 value._name = key
                 value._index = param_index
-                parameters.append(value)
+                params.append(value)
                 param_index += 1
 
-        bases += cls._get_superclass_injections(name, parameters)
+        bases += cls._get_superclass_injections(name, params)
+
+        namespace = dict(namespace)
+        if name != 'ATCommand' and '_pack' not in namespace:
+            namespace['_pack'] = _compile_pack(name, params)
+            namespace['_pack'].__doc__ = ATCommand._pack.__doc__
 
-        return type.__new__(cls, name, bases, dict(namespace))
+        return type.__new__(cls, name, bases, namespace)
 
     @staticmethod
     def _get_superclass_injections(class_name, parameters):
@@ -75,7 +125,16 @@ class ATCommand(metaclass=ATCommandMeta):
         :param seq: sequence number
         :rtype: bytes
         '''
+        return self._pack_generic(seq)
 
+    def _pack_generic(self, seq='SEQUNSET'):
+        '''
+        Same as :py:meth:`_pack`, by calling
+        :py:meth:`~pyardrone.at.parameters.Parameter._pack` of each
+        parameter.
+        Subclasses use a specialised version generated by the metaclass
+        instead.
+        '''
         return 'AT*{clsname}={seq}{argl_wc}\r'.format(
             clsname=type(self).__name__,
             seq=seq,
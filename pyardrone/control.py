@@ -0,0 +1,214 @@
+'''
+Fixed-rate control loops.
+'''
+
+import threading
+import time
+
+from pyardrone import at
+from pyardrone.utils.timing import Ticker
+
+
+class LoopStats:
+
+    '''
+    Statistics of a :py:class:`PCMDScheduler`.
+
+    .. attribute:: sent
+
+        number of PCMD commands sent
+
+    .. attribute:: deduplicated
+
+        number of ticks on which the unchanged setpoint was not resent
+    '''
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.sent = 0
+        self.deduplicated = 0
+
+    def __repr__(self):
+        return (
+            '{self.__class__.__name__}(ticks={self.ticks}, sent={self.sent}, '
+            'deduplicated={self.deduplicated}, missed={self.missed}, '
+            'mean_lateness={self.mean_lateness:.6f}, '
+            'jitter={self.jitter:.6f})'
+        ).format(self=self)
+
+    @property
+    def ticks(self):
+        '''
+        number of ticks run
+        '''
+        return self.ticker.ticks
+
+    @property
+    def missed(self):
+        '''
+        number of ticks skipped because the loop was late by a period or more
+        '''
+        return self.ticker.missed
+
+    @property
+    def lateness(self):
+        '''
+        :py:class:`~pyardrone.utils.timing.Histogram` of the delay between
+        the deadline of each tick and the time it was run, in seconds
+        '''
+        return self.ticker.lateness
+
+    @property
+    def mean_lateness(self):
+        return self.lateness.mean
+
+    @property
+    def max_lateness(self):
+        return self.lateness.max
+
+    @property
+    def jitter(self):
+        '''
+        standard deviation of the lateness, in seconds
+        '''
+        return self.lateness.std
+
+
+class PCMDScheduler:
+
+    '''
+    Owns the movement setpoint of a drone and sends it as
+    :py:class:`~pyardrone.at.PCMD` at a fixed *rate*, from a background
+    thread.
+
+    Ticks are run by a :py:class:`~pyardrone.utils.timing.Ticker`, so the
+    rate does not drift with the time spent on each tick. If the loop falls
+    behind by a period or more, the missed ticks are skipped and counted.
+
+    An unchanged setpoint is only resent every *keepalive* seconds, the
+    connection being kept alive by the watchdog of the
+    :py:class:`~pyardrone.at.ATClient` meanwhile. Set *keepalive* to ``0``
+    to send on every tick.
+
+    When stopped, including by an exception raised inside the ``with``
+    block, the scheduler sends the hover setpoint, unless *hover_on_stop* is
+    false: the watchdog keeps the connection alive, so the drone would
+    otherwise keep moving with the last setpoint.
+
+        >>> with PCMDScheduler(drone, rate=30) as scheduler:
+        ...     scheduler.move(forward=0.3)
+        ...     time.sleep(2)
+        ...     scheduler.hover()
+        >>> scheduler.stats
+        LoopStats(ticks=60, sent=4, deduplicated=56, missed=0, ...)
+
+    :param drone: an :py:class:`~pyardrone.ARDrone`, or anything with a
+                  ``send`` method
+    :param rate: ticks per second
+    :param keepalive: seconds between resending an unchanged setpoint
+    :param hover_on_stop: whether to send the hover setpoint when stopped
+    :param clock: see :py:class:`~pyardrone.utils.timing.Ticker`
+    :param sleep: a function sleeping the given number of seconds of
+                  *clock*, used instead of waiting for :py:meth:`stop`; if it
+                  returns true, the scheduler stops
+    '''
+
+    def __init__(
+            self, drone, rate=30, *,
+            keepalive=0.5, hover_on_stop=True,
+            clock=time.monotonic, sleep=None):
+        self.drone = drone
+        self.period = 1 / rate
+        self.keepalive = keepalive
+        self.hover_on_stop = hover_on_stop
+        self._setpoint = self._hover = at.PCMD(flag=0)
+        self._stopped = threading.Event()
+        self._sleep = sleep
+        self._thread = None
+        self._ticker = Ticker(self.period, sleep=self._wait, clock=clock)
+        self.stats = LoopStats(self._ticker)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def setpoint(self):
+        '''
+        The :py:class:`~pyardrone.at.PCMD` command sent on each tick.
+        '''
+        return self._setpoint
+
+    @setpoint.setter
+    def setpoint(self, command):
+        self._setpoint = command
+
+    def move(
+            self, *,
+            forward=0, backward=0,
+            left=0, right=0,
+            up=0, down=0,
+            cw=0, ccw=0):
+        '''
+        Sets the setpoint, same arguments as
+        :py:meth:`~pyardrone.ARDrone.move`.
+        '''
+        self.setpoint = at.PCMD(
+            at.PCMD.flag.progressive,
+            roll=right-left,
+            pitch=backward-forward,
+            gaz=up-down,
+            yaw=cw-ccw
+        )
+
+    def hover(self):
+        '''
+        Sets the setpoint to hovering.
+        '''
+        self.setpoint = self._hover
+
+    def start(self):
+        '''
+        Starts the background thread.
+        '''
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stops the background thread, and sends the hover setpoint if
+        *hover_on_stop* is true; otherwise the last setpoint stays in effect.
+        '''
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            if self.hover_on_stop:
+                self.setpoint = self._hover
+                self.drone.send(self._hover)
+
+    def _wait(self, seconds):
+        # returns true once stopped, which stops the ticker
+        if self._sleep is None:
+            return self._stopped.wait(seconds)
+        return self._sleep(seconds) or self._stopped.is_set()
+
+    def _run(self):
+        last_sent = None
+        last_sent_time = None
+        for now in self._ticker:
+            setpoint = self._setpoint
+            if (
+                setpoint != last_sent or
+                now - last_sent_time >= self.keepalive
+            ):
+                self.drone.send(setpoint)
+                self.stats.sent += 1
+                last_sent = setpoint
+                last_sent_time = now
+            else:
+                self.stats.deduplicated += 1
@@ -0,0 +1,211 @@
+'''
+Controlling many drones from a single event loop.
+
+    >>> from pyardrone.fleet import Fleet
+    >>> with Fleet() as fleet:
+    ...     drones = [fleet.add(host=host) for host in hosts]
+    ...     for drone in drones:
+    ...         drone.navdata_ready.wait()
+    ...     for drone in drones:
+    ...         drone.takeoff()
+'''
+
+import asyncio
+import threading
+
+from pyardrone import ARDroneBase, HelperMixin, VideoMixin
+from pyardrone.at import BatchScope
+from pyardrone.at.aio import AsyncATClient
+from pyardrone.navdata.aio import AsyncNavDataClient
+
+
+class _NavDataClient(AsyncNavDataClient):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.navdata_ready_threadsafe = threading.Event()
+
+    def navdata_received(self, data):
+        if not super().navdata_received(data):
+            return False
+        self.navdata_ready_threadsafe.set()
+        return True
+
+
+class FleetDroneBase(ARDroneBase):
+
+    '''
+    An :py:class:`~pyardrone.ARDroneBase` whose AT and navdata clients run
+    on the event loop of a :py:class:`Fleet`.
+
+    Create it with :py:meth:`Fleet.add`.
+    '''
+
+    #: keyword arguments of :py:class:`~pyardrone.ARDroneBase` which
+    #: :py:class:`~pyardrone.navdata.aio.AsyncNavDataClient` does not support
+    unsupported_arguments = ('zero_copy', 'drain', 'latest_only')
+
+    def __init__(self, fleet, **kwargs):
+        unsupported = [
+            name for name in self.unsupported_arguments if name in kwargs]
+        if unsupported:
+            raise TypeError('{} does not support {}'.format(
+                self.__class__.__name__, ', '.join(unsupported)))
+        self.fleet = fleet
+        self._batches = BatchScope()
+        super().__init__(**kwargs)
+
+    @property
+    def navdata_ready(self):
+        return self.navdata_client.navdata_ready_threadsafe
+
+    def wait_next(self, timeout=None):
+        return self.fleet.run(self.navdata_client.wait_next(timeout))
+
+    wait_next.__doc__ = ARDroneBase.wait_next.__doc__
+
+    def wait_for(self, predicate, timeout=None):
+        return self.fleet.run(self.navdata_client.wait_for(predicate, timeout))
+
+    wait_for.__doc__ = ARDroneBase.wait_for.__doc__
+
+    def send(self, command):
+        '''
+        :param ~pyardrone.at.base.ATCommand command: command to send
+
+        Sends the command to the drone,
+        with an internal increasing sequence number.
+        this method is thread-safe; the command is sent by the event loop
+        of the fleet.
+        '''
+        batch = self._batches.current
+        if batch is not None:
+            batch.append(command)
+        else:
+            self.fleet.call_soon(self.at_client.send, command)
+
+    def batch(self):
+        return self._batches.collect(
+            lambda batch: self.fleet.call_soon(self._send_batch, batch))
+
+    batch.__doc__ = ARDroneBase.batch.__doc__
+
+    def _send_batch(self, commands):
+        with self.at_client.batch():
+            for command in commands:
+                self.at_client.send(command)
+
+    def _connect(self):
+        self.fleet.call(self._connect_clients)
+
+    def _connect_clients(self):
+        self.at_client = AsyncATClient(
+            self.host, self.at_port, self.watchdog_interval)
+        self.navdata_client = _NavDataClient(
+            self.host, self.navdata_port,
+            lazy=self.lazy,
+            verify_checksum=self.verify_checksum,
+            track_sequence=self.track_sequence,
+        )
+        self.at_client.connect()
+        self.navdata_client.connect()
+
+    def _close(self):
+        self.fleet.call(super()._close)
+
+
+class FleetDrone(HelperMixin, VideoMixin, FleetDroneBase):
+
+    '''
+    A drone of a :py:class:`Fleet`, with the same interface as
+    :py:class:`~pyardrone.ARDrone`.
+
+    Video, if available, is still received by the threads of
+    :py:class:`~pyardrone.video.VideoClient`.
+    '''
+
+
+class Fleet:
+
+    '''
+    Runs the AT and navdata clients of many drones on a single asyncio event
+    loop, in one background thread, instead of one thread per socket.
+
+    Per-drone state is still available as
+    :py:attr:`FleetDrone.navdata <pyardrone.ARDrone.navdata>` and
+    :py:attr:`FleetDrone.state <pyardrone.ARDrone.state>`.
+
+    The event loop is started on creation; :py:meth:`close` closes all drones
+    and stops it.
+    '''
+
+    def __init__(self):
+        self.drones = []
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, *, connect=True, **kwargs):
+        '''
+        Creates a :py:class:`FleetDrone` which runs on the fleet's event loop.
+
+        Keyword arguments are the same as :py:class:`~pyardrone.ARDrone`,
+        except for *zero_copy*, *drain* and *latest_only*, which the asyncio
+        navdata client does not support.
+
+        :raises TypeError: if an unsupported argument is given
+        '''
+        drone = FleetDrone(self, connect=False, **kwargs)
+        self.drones.append(drone)
+        if connect:
+            drone.connect()
+        return drone
+
+    def call(self, function, *args):
+        '''
+        Calls *function* on the event loop and returns its result,
+        blocking until it has been called.
+        '''
+        if threading.current_thread() is self._thread:
+            return function(*args)
+
+        async def call():
+            return function(*args)
+
+        return self.run(call())
+
+    def run(self, coroutine):
+        '''
+        Runs *coroutine* on the event loop and returns its result, blocking
+        until it is done. Must not be called from the event loop.
+        '''
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def call_soon(self, function, *args):
+        '''
+        Schedules *function* to be called on the event loop without waiting
+        for it. Calls are made in the order they are scheduled.
+        '''
+        if threading.current_thread() is self._thread:
+            function(*args)
+        else:
+            self.loop.call_soon_threadsafe(function, *args)
+
+    def close(self):
+        '''
+        Closes all drones and stops the event loop.
+        '''
+        if self.loop.is_closed():
+            return
+        for drone in self.drones:
+            drone.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -1,11 +1,20 @@
-from ctypes import sizeof
-from types import SimpleNamespace
+from ctypes import Structure, sizeof
+import selectors
 import socket
+import struct
 import threading
 
 from pyardrone.navdata.options import Metadata, OptionHeader, index
+from pyardrone.navdata.states import DroneState
 from pyardrone.abc import BaseClient
+from pyardrone.utils import logging
+from pyardrone.utils.structure import NUMPY
 
+if NUMPY:
+    import numpy
+
+
+logger = logging.getLogger(__name__)
 
 header = 0x55667788
 
@@ -30,11 +39,54 @@ class InvalidSize(NavDataError):
     pass
 
 
+def _lane_mask(width, nbytes):
+    pattern = b'\xff' * (width // 8) + b'\x00' * (width // 8)
+    return int.from_bytes(pattern * (nbytes * 8 // width // 2), 'little')
+
+
+# below this size, sum() is faster than the vectorized checksums
+_checksum_threshold = 512
+_checksum_max_size = 4096
+_mask8 = _lane_mask(8, _checksum_max_size)
+_mask16 = _lane_mask(16, _checksum_max_size)
+
+
+def _compute_checksum_numpy(buffer):
+    return int(numpy.frombuffer(buffer, numpy.uint8).sum(dtype=numpy.uint32))
+
+
+def _compute_checksum_int(buffer):
+    # sum the bytes of a single big integer: widen the byte lanes into 32-bit
+    # lanes, then repeatedly add the upper half of the lanes onto the lower
+    # half. Lanes cannot overflow for buffers up to _checksum_max_size bytes.
+    value = int.from_bytes(buffer, 'little')
+    value = (value & _mask8) + ((value >> 8) & _mask8)
+    value = (value & _mask16) + ((value >> 16) & _mask16)
+    lanes = (len(buffer) + 3) // 4
+    while lanes > 1:
+        lanes = (lanes + 1) // 2
+        shift = lanes * 32
+        value = (value & ((1 << shift) - 1)) + (value >> shift)
+    return value & 0xffffffff
+
+
+_compute_checksum = _compute_checksum_numpy if NUMPY else _compute_checksum_int
+
+
 def compute_checksum(buffer):
+    '''
+    Returns the navdata checksum of *buffer*: the sum of its bytes, as an
+    unsigned 32-bit integer.
+
+    Large buffers are summed with numpy if it is available, or with big
+    integer arithmetic otherwise.
+    '''
+    if _checksum_threshold <= len(buffer) <= _checksum_max_size:
+        return _compute_checksum(buffer)
     return sum(buffer) & 0xffffffff
 
 
-class NavData(SimpleNamespace):
+class NavData:
 
     '''
     Container of navdata options.
@@ -49,14 +101,39 @@ class NavData(SimpleNamespace):
 
         >>> drone.navdata.demo
         Demo(altitude=0, ctrl_state=131072, detection_camera_rot=...)
+
+    :param buffer: the received navdata packet
+    :param copy: if ``False``, options are created as views over *buffer*
+                 with :py:meth:`~ctypes._CData.from_buffer` instead of being
+                 copied out of it. *buffer* must be writable then, and the
+                 options change along with it; use :py:meth:`snapshot` to
+                 keep the data.
+    :param verify_checksum: if ``False``, the checksum is neither computed
+                            nor verified and :py:attr:`checksum` is ``None``;
+                            use this only for trusted links.
+
+    .. attribute:: checksum
+
+        The checksum computed over the packet, or ``None`` if it was not
+        verified.
+
+    Options are stored in slots, one for each option registered in
+    ``pyardrone.navdata.options.index`` on import; an option which
+    is absent from the packet raises :py:exc:`AttributeError`.
     '''
 
-    def __init__(self, buffer):
-        super().__init__()
+    # options registered after import end up in __dict__
+    __slots__ = ('checksum', Metadata._attrname) + tuple(
+        option_class._attrname for option_class in index.values()
+    ) + ('__dict__',)
 
-        self.checksum = compute_checksum(memoryview(buffer)[:-8])
+    def __init__(self, buffer, *, copy=True, verify_checksum=True):
+        if verify_checksum:
+            self.checksum = compute_checksum(memoryview(buffer)[:-8])
+        else:
+            self.checksum = None
 
-        self.add_option(Metadata, buffer, 0)
+        self.add_option(Metadata, buffer, 0, copy=copy)
 
         offset = sizeof(Metadata)
         while offset < len(buffer):
@@ -69,9 +146,11 @@ class NavData(SimpleNamespace):
                             option_class, sizeof(option_class), header.size
                         )
                     )
-                self.add_option(option_class, buffer, offset)
+                self.add_option(option_class, buffer, offset, copy=copy)
                 offset += sizeof(option_class)
 
+        if not verify_checksum:
+            return
         if not hasattr(self, 'cks'):
             raise ChecksumNotPresent
         if self.checksum != self.cks.value:
@@ -80,33 +159,501 @@ class NavData(SimpleNamespace):
                 self.cks.value
             ))
 
-    def add_option(self, option_class, buffer, offset):
-        option = option_class.from_buffer_copy(buffer, offset)
+    def add_option(self, option_class, buffer, offset, *, copy=True):
+        if copy:
+            option = option_class.from_buffer_copy(buffer, offset)
+        else:
+            option = option_class.from_buffer(buffer, offset)
         setattr(self, option_class._attrname, option)
 
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, ', '.join(
+            '{}={!r}'.format(name, value)
+            for name, value in self.as_dict().items()
+        ))
+
+    def as_dict(self):
+        '''
+        Returns a dict of the option names to the options present, and of
+        ``'checksum'`` to :py:attr:`~pyardrone.navdata.NavData.checksum`.
+        '''
+        result = {}
+        for name in NavData.__slots__[:-1]:
+            try:
+                result[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        result.update(self.__dict__)
+        return result
+
+    def snapshot(self):
+        '''
+        Returns a :py:class:`NavData` holding copies of all options,
+        which stays valid after the underlying buffer is reused.
+        '''
+        navdata = NavData.__new__(NavData)
+        for name, value in self.as_dict().items():
+            if isinstance(value, Structure):
+                value = type(value).from_buffer_copy(value)
+            setattr(navdata, name, value)
+        return navdata
+
+
+class LazyNavData(NavData):
+
+    '''
+    A :py:class:`NavData` which only records the offsets of the options while
+    scanning the packet, an option is created the first time it is accessed.
+
+    The checksum is still verified on creation.
+    '''
+
+    __slots__ = ('_buffer', '_copy', '_offsets')
+
+    def __init__(self, buffer, *, copy=True, verify_checksum=True):
+        self._buffer = buffer
+        self._copy = copy
+        self._offsets = {}
+        super().__init__(
+            buffer, copy=copy, verify_checksum=verify_checksum)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            option_class, offset = self._offsets.pop(name)
+        except KeyError:
+            raise AttributeError(
+                '{!r} object has no attribute {!r}'.format(
+                    self.__class__.__name__, name)) from None
+        super().add_option(option_class, self._buffer, offset, copy=self._copy)
+        return getattr(self, name)
+
+    def add_option(self, option_class, buffer, offset, *, copy=True):
+        self._offsets[option_class._attrname] = (option_class, offset)
+
+    def as_dict(self):
+        for name in list(self._offsets):
+            getattr(self, name)
+        return super().as_dict()
+
+
+_uint32 = struct.Struct('<I')
+
+
+def peek_sequence_number(buffer):
+    '''
+    Returns the sequence number of the navdata packet in *buffer*, without
+    parsing it.
+    '''
+    return _uint32.unpack_from(buffer, Metadata.sequence_number.offset)[0]
+
+
+def peek_state(buffer):
+    '''
+    Returns the drone state word of the navdata packet in *buffer*, without
+    parsing it.
+    '''
+    return _uint32.unpack_from(buffer, Metadata.state.offset)[0]
+
 
-class NavDataClient(BaseClient):
+class SequenceTracker:
 
-    def __init__(self, host, port, timeout=0.01):
+    '''
+    Tracks the sequence numbers of the navdata packets of a drone, to
+    discard stale and duplicate packets before they are parsed.
+
+    The drone restarts its sequence after its communication watchdog
+    expires. As in the SDK, a packet is taken as restarting the sequence,
+    and is accepted, if it is marked as *restarted*, which
+    :py:class:`NavDataHandler` does when its state has
+    :py:attr:`~pyardrone.navdata.states.DroneState.com_watchdog_mask` set,
+    or if its sequence number is ``1``. So is a packet older than the newest
+    one accepted by more than :py:attr:`reset_threshold`.
+
+    .. attribute:: last
+
+        sequence number of the newest packet accepted, or ``None``
+
+    .. attribute:: accepted
+
+        number of packets accepted
+
+    .. attribute:: duplicates
+
+        number of packets discarded for having the sequence number of the
+        newest accepted packet
+
+    .. attribute:: reordered
+
+        number of packets discarded for being older than the newest accepted
+        packet
+
+    .. attribute:: lost
+
+        number of sequence numbers skipped and not received later
+
+    .. attribute:: resets
+
+        number of times the sequence was restarted
+    '''
+
+    #: how much older than the newest accepted packet a packet has to be
+    #: to be taken as restarting the sequence
+    reset_threshold = 1000
+
+    def __init__(self):
+        self.last = None
+        self.accepted = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.lost = 0
+        self.resets = 0
+
+    def __repr__(self):
+        return (
+            '{self.__class__.__name__}(last={self.last}, '
+            'accepted={self.accepted}, duplicates={self.duplicates}, '
+            'reordered={self.reordered}, lost={self.lost}, '
+            'resets={self.resets})'
+        ).format(self=self)
+
+    def accept(self, sequence_number, restarted=False):
+        '''
+        Returns whether the packet with *sequence_number* is newer than
+        those accepted before, or restarts the sequence, updating the
+        counters.
+        '''
+        last = self.last
+        if last is not None:
+            if sequence_number == last:
+                self.duplicates += 1
+                return False
+            if restarted or sequence_number == 1:
+                self.resets += 1
+            elif sequence_number < last:
+                if last - sequence_number <= self.reset_threshold:
+                    # it was counted as lost when a newer packet arrived
+                    self.reordered += 1
+                    self.lost = max(0, self.lost - 1)
+                    return False
+                self.resets += 1
+            else:
+                self.lost += sequence_number - last - 1
+        self.last = sequence_number
+        self.accepted += 1
+        return True
+
+
+class NavDataHandler:
+
+    '''
+    Base class of navdata clients, builds :py:class:`NavData` out of the
+    received packets.
+
+    .. attribute:: navdata
+
+        The latest :py:class:`NavData`.
+
+    .. attribute:: recorder
+
+        A :py:class:`~pyardrone.navdata.recorder.NavDataRecorder` every
+        received navdata is recorded to, or ``None``.
+
+    .. attribute:: sequence
+
+        The :py:class:`SequenceTracker` discarding stale and duplicate
+        packets, or ``None`` to parse every packet.
+    '''
+
+    _com_watchdog_mask = DroneState.com_watchdog_mask.mask
+
+    recorder = None
+    sequence = None
+    # replaced, never mutated, so that it can be iterated while callbacks
+    # are subscribed from another thread
+    _subscribers = {}
+    zero_copy = False
+    lazy = False
+    verify_checksum = True
+
+    def navdata_received(self, data):
+        '''
+        Parses the packet *data* into
+        :py:attr:`~pyardrone.navdata.NavDataHandler.navdata`, unless it is
+        discarded by :py:attr:`~pyardrone.navdata.NavDataHandler.sequence`.
+        Returns whether it was parsed; invalid packets are logged and
+        dropped.
+        '''
+        if (
+            self.sequence is not None and
+            len(data) >= sizeof(Metadata) and
+            not self._accept_sequence(data)
+        ):
+            return False
+        # with subscribers, decode only the options which are used
+        navdata_class = (
+            LazyNavData if self.lazy or self._subscribers else NavData)
+        try:
+            navdata = navdata_class(
+                data,
+                copy=not self.zero_copy,
+                verify_checksum=self.verify_checksum,
+            )
+        # the options of corrupt packets may also have unknown tags, or be
+        # truncated
+        except (NavDataError, KeyError, ValueError) as exc:
+            logger.warning('dropped navdata: {!r}', exc)
+            return False
+        self.navdata = navdata
+        if self.recorder is not None:
+            self.recorder.record(self.navdata)
+        for option_class, callbacks in self._subscribers.items():
+            option = getattr(self.navdata, option_class._attrname, None)
+            if option is None:
+                continue
+            for callback in callbacks:
+                try:
+                    callback(option)
+                except Exception:
+                    logger.exception('navdata callback {!r} failed', callback)
+        return True
+
+    def _accept_sequence(self, data):
+        return self.sequence.accept(
+            peek_sequence_number(data),
+            restarted=bool(peek_state(data) & self._com_watchdog_mask),
+        )
+
+    def _restarts_sequence(self, data):
+        return (
+            peek_sequence_number(data) == 1 or
+            bool(peek_state(data) & self._com_watchdog_mask)
+        )
+
+    def subscribe(self, option, callback):
+        '''
+        Calls *callback* with the option each time a navdata containing it
+        is received.
+
+        *option* is an option class of :py:mod:`pyardrone.navdata.options`
+        or its tag. While callbacks are subscribed, :py:class:`LazyNavData`
+        is created even without ``lazy=True``, so that only the options which
+        have subscribers, or are accessed, are decoded:
+
+            >>> client = NavDataClient('192.168.1.1', 5554)
+            >>> client.subscribe(options.Magneto, print)
+
+        Callbacks are called from the thread or event loop receiving the
+        navdata, and must not block it.
+        '''
+        option_class = self._option_class(option)
+        subscribers = dict(self._subscribers)
+        subscribers[option_class] = (
+            subscribers.get(option_class, ()) + (callback,))
+        self._subscribers = subscribers
+
+    def unsubscribe(self, option, callback):
+        '''
+        Stops calling *callback* for *option*.
+
+        :raises ValueError: if *callback* is not subscribed to *option*.
+        '''
+        option_class = self._option_class(option)
+        callbacks = list(self._subscribers.get(option_class, ()))
+        callbacks.remove(callback)
+        subscribers = dict(self._subscribers)
+        if callbacks:
+            subscribers[option_class] = tuple(callbacks)
+        else:
+            del subscribers[option_class]
+        self._subscribers = subscribers
+
+    @staticmethod
+    def _option_class(option):
+        if isinstance(option, int):
+            return index[option]
+        return option
+
+
+class NavDataClient(NavDataHandler, BaseClient):
+
+    '''
+    :param host: address of the drone
+    :param port: navdata port
+    :param timeout: unused, kept for compatibility; the listener thread
+                    blocks until a packet arrives or the client is closed
+    :param zero_copy: receive packets into reusable buffers and create
+                      :py:class:`NavData` with ``copy=False``;
+                      :py:attr:`~pyardrone.navdata.NavDataHandler.navdata`
+                      is then only valid until the next
+                      packet but one arrives, call
+                      :py:meth:`NavData.snapshot` to keep it longer.
+    :param lazy: create :py:class:`LazyNavData` instead of
+                 :py:class:`NavData`
+    :param verify_checksum: whether to verify the checksum of the packets
+    :param drain: receive all queued packets, up to :py:attr:`drain_size`,
+                  each time the socket becomes readable, and parse only the
+                  one with the highest sequence number unless a
+                  :py:attr:`recorder` is set; keeps the listener from
+                  falling behind at high navdata rates.
+    :param latest_only: like *drain*, but parse only the newest packet even
+                        if a :py:attr:`recorder` is set; for control loops, to
+                        which fresh navdata matters more than complete
+                        navdata.
+    :param track_sequence: whether to discard stale and duplicate packets
+                           with a :py:class:`SequenceTracker`
+
+    .. attribute:: packets_received
+
+        number of packets received from the drone
+
+    .. attribute:: packets_skipped
+
+        number of packets received but not parsed
+    '''
+
+    #: maximum number of packets received per wakeup if *drain* is set
+    drain_size = 32
+
+    def __init__(
+        self,
+        host,
+        port,
+        timeout=0.01,
+        *,
+        zero_copy=False,
+        lazy=False,
+        verify_checksum=True,
+        drain=False,
+        latest_only=False,
+        track_sequence=True
+    ):
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.zero_copy = zero_copy
+        self.lazy = lazy
+        self.verify_checksum = verify_checksum
+        self.drain = drain or latest_only
+        self.latest_only = latest_only
+        self.packets_received = 0
+        self.packets_skipped = 0
+        if track_sequence:
+            self.sequence = SequenceTracker()
         self.navdata_ready = threading.Event()
+        # notified on each navdata and on close
+        self._condition = threading.Condition()
+        self._navdata_count = 0
+
+    def wait_next(self, timeout=None):
+        '''
+        Blocks until the next navdata is received and returns it, or
+        returns ``None`` after *timeout* seconds.
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        count = self._navdata_count
+        return self._wait(
+            lambda navdata: self._navdata_count != count, timeout)
+
+    def wait_for(self, predicate, timeout=None):
+        '''
+        Blocks until *predicate* called with
+        :py:attr:`~pyardrone.navdata.NavDataHandler.navdata` returns true, and
+        returns that navdata, or returns ``None`` after *timeout* seconds.
+        The predicate is checked against the current navdata, then against
+        each navdata received:
+
+            >>> client.wait_for(lambda navdata: navdata.demo.altitude > 1000)
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        return self._wait(predicate, timeout)
+
+    def _wait(self, predicate, timeout):
+        result = None
+
+        def ready():
+            nonlocal result
+            if self.closed:
+                return True
+            navdata = getattr(self, 'navdata', None)
+            if navdata is not None and predicate(navdata):
+                result = navdata
+                return True
+            return False
+
+        with self._condition:
+            self._condition.wait_for(ready, timeout)
+        if result is None and self.closed:
+            raise RuntimeError(
+                '{} is closed already'.format(self.__class__.__name__))
+        return result
 
     def _listener_job(self):
-        while not self.closed:
+        # packets are received into a pool of buffers, the last of which
+        # holds the published navdata, so that it is not overwritten while
+        # the next packets are being received
+        size = self.drain_size if self.drain else 1
+        pool = [bytearray(4096) for _ in range(size + 1)]
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            selector.register(self._wakeup_receiver, selectors.EVENT_READ)
+            while not self.closed:
+                for key, _ in selector.select():
+                    if key.fileobj is self.sock:
+                        self._receive(pool)
+
+    def _receive(self, pool):
+        received = []
+        for slot in range(len(pool) - 1):
             try:
-                data, addr = self.sock.recvfrom(4096)
-            except socket.timeout:
-                pass
-            else:
-                if addr == (self.host, self.port):
-                    self.navdata_received(data)
-                    self.navdata_ready.set()
+                nbytes, addr = self.sock.recvfrom_into(pool[slot])
+            except BlockingIOError:
+                break
+            # shorter packets cannot even hold the metadata
+            if addr == (self.host, self.port) and nbytes >= sizeof(Metadata):
+                received.append((slot, memoryview(pool[slot])[:nbytes]))
+        if not received:
+            return
+        count = len(received)
+        if self.latest_only or (self.recorder is None and count > 1):
+            # packets may arrive out of order; older packets would be
+            # overwritten right away, they are only tracked. Sequence
+            # numbers only compare since the last restart of the sequence,
+            # so only the packets from there on are ordered by them
+            start = 0
+            for position, (_, data) in enumerate(received):
+                if self._restarts_sequence(data):
+                    start = position
+            received[start:] = sorted(
+                received[start:],
+                key=lambda item: peek_sequence_number(item[1]))
+            if self.sequence is not None:
+                for _, data in received[:-1]:
+                    self._accept_sequence(data)
+            del received[:-1]
+        self.packets_received += count
+        self.packets_skipped += count - len(received)
+        parsed = None
+        for slot, data in received:
+            if self.navdata_received(data if self.zero_copy else bytes(data)):
+                parsed = slot
+        if parsed is None:
+            return
+        self.navdata_ready.set()
+        with self._condition:
+            self._navdata_count += 1
+            self._condition.notify_all()
+        if self.zero_copy:
+            pool[parsed], pool[-1] = pool[-1], pool[parsed]
 
     def _connect(self):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.settimeout(self.timeout)
+        self.sock.setblocking(False)
+        # written to by close() to wake the listener thread up
+        self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
 
         self.sock.sendto(
             b'\x01\x00\x00\x00',
@@ -116,8 +663,10 @@ class NavDataClient(BaseClient):
         self._thread.start()
 
     def _close(self):
+        self._wakeup_sender.send(b'\0')
         self._thread.join()
+        with self._condition:
+            self._condition.notify_all()
         self.sock.close()
-
-    def navdata_received(self, data):
-        self.navdata = NavData(data)
+        self._wakeup_sender.close()
+        self._wakeup_receiver.close()
@@ -0,0 +1,166 @@
+'''
+asyncio support for navdata.
+'''
+
+import asyncio
+import socket
+
+from pyardrone.abc import BaseClient
+from pyardrone.navdata import NavDataHandler, SequenceTracker
+from pyardrone.utils import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class _NavDataProtocol(asyncio.DatagramProtocol):
+
+    def __init__(self, client):
+        self.client = client
+
+    def datagram_received(self, data, addr):
+        if addr == (self.client.host, self.client.port):
+            self.client.navdata_received(data)
+
+    def error_received(self, exc):
+        logger.warning('navdata socket error: {!r}', exc)
+
+
+class AsyncNavDataClient(NavDataHandler, BaseClient):
+
+    '''
+    A navdata client running on an asyncio event loop instead of a thread.
+    Packets are parsed as they are received by the event loop.
+
+    :py:meth:`~pyardrone.abc.BaseClient.connect` and
+    :py:meth:`~pyardrone.abc.BaseClient.close` have to be called from the
+    event loop.
+
+        >>> client = AsyncNavDataClient('192.168.1.1', 5554)
+        >>> client.connect()
+        >>> navdata = await client.next_navdata()
+        >>> async for navdata in client:
+        ...     print(navdata.metadata.sequence_number)
+
+    Iterating the client yields the navdata received after each step, until
+    the client is closed; packets arriving while the consumer is busy are
+    skipped.
+
+    :param host: address of the drone
+    :param port: navdata port
+    :param lazy: create :py:class:`~pyardrone.navdata.LazyNavData` instead of
+                 :py:class:`~pyardrone.navdata.NavData`
+    :param verify_checksum: whether to verify the checksum of the packets
+    :param track_sequence: whether to discard stale and duplicate packets by
+                           sequence number, see
+                           :py:class:`~pyardrone.navdata.SequenceTracker`
+
+    .. attribute:: navdata_ready
+
+        An :py:class:`asyncio.Event` set once the first navdata is received.
+    '''
+
+    def __init__(
+            self, host, port, *,
+            lazy=False, verify_checksum=True, track_sequence=True):
+        self.host = host
+        self.port = port
+        self.lazy = lazy
+        self.verify_checksum = verify_checksum
+        if track_sequence:
+            self.sequence = SequenceTracker()
+        self.navdata_ready = asyncio.Event()
+        self._waiters = []
+
+    def _connect(self):
+        self.loop = asyncio.get_running_loop()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.sendto(b'\x01\x00\x00\x00', (self.host, self.port))
+        self._endpoint = self.loop.create_task(
+            self.loop.create_datagram_endpoint(
+                lambda: _NavDataProtocol(self),
+                sock=self.sock,
+            )
+        )
+
+    def _close(self):
+        if self._endpoint.done() and not self._endpoint.cancelled():
+            transport, _ = self._endpoint.result()
+            transport.close()
+        else:
+            self._endpoint.cancel()
+            self.sock.close()
+        exc = RuntimeError(
+            '{} is closed already'.format(self.__class__.__name__))
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_exception(exc)
+        self._waiters.clear()
+
+    def navdata_received(self, data):
+        if not super().navdata_received(data):
+            return False
+        self.navdata_ready.set()
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(self.navdata)
+        self._waiters.clear()
+        return True
+
+    async def next_navdata(self):
+        '''
+        Waits for the next navdata and returns it.
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        if self.closed:
+            raise RuntimeError(
+                '{} is closed already'.format(self.__class__.__name__))
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return await waiter
+
+    async def wait_next(self, timeout=None):
+        '''
+        Waits for the next navdata and returns it, or returns ``None`` after
+        *timeout* seconds.
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        try:
+            return await asyncio.wait_for(self.next_navdata(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def wait_for(self, predicate, timeout=None):
+        '''
+        Waits until *predicate* called with
+        :py:attr:`~pyardrone.navdata.NavDataHandler.navdata` returns true, and
+        returns that navdata, or returns ``None`` after *timeout* seconds.
+        The predicate is checked against the current navdata, then against
+        each navdata received.
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        try:
+            return await asyncio.wait_for(self._wait_for(predicate), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _wait_for(self, predicate):
+        navdata = getattr(self, 'navdata', None)
+        while navdata is None or not predicate(navdata):
+            navdata = await self.next_navdata()
+        return navdata
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.next_navdata()
+        except RuntimeError:
+            if self.closed:
+                raise StopAsyncIteration
+            raise
@@ -0,0 +1,184 @@
+'''
+Columnar recording of navdata history, requires numpy.
+
+To keep the recent altitude and velocity of the drone:
+
+    >>> from pyardrone.navdata.recorder import NavDataRecorder
+    >>> recorder = NavDataRecorder(
+    ...     ['demo.altitude', 'demo.vx', 'raw_measures'],
+    ...     capacity=200 * 60 * 5,  # 5 minutes at 200 Hz
+    ... )
+    >>> drone.navdata_client.recorder = recorder
+    >>> recorder['demo.altitude']  # all recorded altitudes, oldest first
+    array([1203, 1204, 1204, ...], dtype=int32)
+    >>> recorder.last(1.5)['demo.vx']  # vx of the last 1.5 seconds
+    array([ 0.12,  0.13, ...], dtype=float32)
+'''
+
+import mmap
+import time
+
+import numpy
+
+from pyardrone.navdata.options import Metadata, index
+
+
+_alignment = 64
+
+
+def _option_classes():
+    classes = {Metadata._attrname: Metadata}
+    for option_class in index.values():
+        classes[option_class._attrname] = option_class
+    return classes
+
+
+class NavDataRecorder:
+
+    '''
+    Records selected navdata fields into a preallocated ring buffer of
+    *capacity* samples per column.
+
+    Each column is stored twice in a row in a memory map, and each sample is
+    written to both halves, so that the latest *capacity* samples are always
+    a contiguous slice. Queries therefore return numpy views without copying;
+    the views alias the ring buffer and are overwritten as new samples arrive,
+    call :py:meth:`numpy.ndarray.copy` to keep them.
+
+    :param fields: list of ``'option.field'`` to record a field of an option,
+                   or ``'option'`` to record the whole option as a numpy
+                   structured record.
+                   Option names are the attribute names of
+                   :py:class:`~pyardrone.navdata.NavData`.
+    :param capacity: number of samples kept
+    :param path: file to map the ring buffer to; anonymous memory is used if
+                 ``None``
+    :raises ValueError: if a field does not exist
+
+    The ``'timestamp'`` column holds the :py:func:`time.monotonic` time of
+    each sample.
+    '''
+
+    def __init__(self, fields, capacity, path=None):
+        self.capacity = capacity
+        self.count = 0
+
+        option_classes = _option_classes()
+        self._columns = [('timestamp', None, None, numpy.dtype(numpy.float64))]
+        for name in fields:
+            option_name, _, field = name.partition('.')
+            try:
+                option_class = option_classes[option_name]
+            except KeyError:
+                raise ValueError('unknown option {!r}'.format(option_name))
+            if not field:
+                dtype = option_class.dtype
+            elif field in option_class.dtype.names:
+                dtype = option_class.dtype[field]
+            else:
+                raise ValueError('{} has no field {!r}'.format(
+                    option_class.__name__, field))
+            self._columns.append((name, option_name, field or None, dtype))
+
+        offsets = []
+        size = 0
+        for _, _, _, dtype in self._columns:
+            offsets.append(size)
+            size += dtype.itemsize * capacity * 2
+            size += -size % _alignment
+
+        if path is None:
+            self._mmap = mmap.mmap(-1, size)
+        else:
+            with open(path, 'w+b') as file:
+                file.truncate(size)
+                self._mmap = mmap.mmap(file.fileno(), size)
+
+        self._arrays = {
+            name: numpy.frombuffer(
+                self._mmap, dtype, count=capacity * 2, offset=offset)
+            for (name, _, _, dtype), offset in zip(self._columns, offsets)
+        }
+        self._options = sorted({
+            option_name for _, option_name, _, _ in self._columns
+            if option_name is not None
+        })
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def columns(self):
+        '''
+        Names of the recorded columns, including ``'timestamp'``.
+        '''
+        return [name for name, _, _, _ in self._columns]
+
+    def record(self, navdata, timestamp=None):
+        '''
+        Appends a sample from *navdata*, overwriting the oldest sample if the
+        ring buffer is full.
+
+        :param timestamp: time of the sample, defaults to
+                          :py:func:`time.monotonic`
+        :returns: ``False`` if *navdata* lacks a recorded option, in which
+                  case nothing is recorded; ``True`` otherwise.
+        '''
+        options = {}
+        for option_name in self._options:
+            option = getattr(navdata, option_name, None)
+            if option is None:
+                return False
+            options[option_name] = option
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        position = self.count % self.capacity
+        mirror = position + self.capacity
+        for name, option_name, field, dtype in self._columns:
+            array = self._arrays[name]
+            if option_name is None:
+                value = timestamp
+            elif field is None:
+                value = numpy.frombuffer(options[option_name], dtype)[0]
+            else:
+                value = getattr(options[option_name], field)
+            array[position] = array[mirror] = value
+        self.count += 1
+        return True
+
+    def __getitem__(self, name):
+        '''
+        Returns a view of all samples of column *name* in the buffer, oldest
+        first.
+        '''
+        return self._window(self._arrays[name], len(self))
+
+    def _window(self, array, n):
+        end = self.count % self.capacity + self.capacity
+        return array[end - n:end]
+
+    def since(self, timestamp):
+        '''
+        Returns a dict of views of the columns holding the samples recorded
+        at or after *timestamp*.
+        '''
+        timestamps = self['timestamp']
+        n = len(timestamps) - numpy.searchsorted(timestamps, timestamp)
+        return {
+            name: self._window(array, n)
+            for name, array in self._arrays.items()
+        }
+
+    def last(self, seconds):
+        '''
+        Returns a dict of views of the columns holding the samples recorded
+        in the last *seconds* seconds.
+        '''
+        return self.since(time.monotonic() - seconds)
+
+    def flush(self):
+        '''
+        Flushes the ring buffer to the mapped file.
+        '''
+        self._mmap.flush()
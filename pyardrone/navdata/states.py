@@ -1,7 +1,14 @@
+from pyardrone.utils.structure import NUMPY
+
+if NUMPY:
+    import numpy
+
+
 class StateMask:
 
     def __init__(self, bit, doc=None):
         self.bit = bit
+        self.mask = 1 << bit
         if doc is not None:
             self.__doc__ = 'bit {}.  {}'.format(bit, doc)
 
@@ -9,7 +16,7 @@ class StateMask:
         if obj is None:
             return self
         else:
-            return bool(obj._data >> self.bit & 1)
+            return obj._data & self.mask != 0
 
     def __set__(self, obj, value):
         raise AttributeError('{!r} of {!r} is not settable'.format(self, obj))
@@ -17,12 +24,39 @@ class StateMask:
 
 class DroneState:
 
+    '''
+    The drone state word of :py:attr:`Metadata.state
+    <pyardrone.navdata.options.Metadata.state>`, with a boolean attribute
+    for each bit.
+    '''
+
+    __slots__ = ('_data',)
+
+    #: ``(name, bit)`` of the masks, ordered by bit
+    masks = ()
+
     def __init__(self, data):
         self._data = data
 
     def __repr__(self):
         return '{self.__class__.__name__}(0b{self._data:b})'.format(self=self)
 
+    def __eq__(self, other):
+        if isinstance(other, DroneState):
+            return self._data == other._data
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._data)
+
+    def as_dict(self):
+        '''
+        Returns all the masks as a dict of their names to booleans.
+        '''
+        # bit n is character n of the reversed binary string
+        flags = '{:032b}'.format(self._data)[::-1]
+        return {name: flags[bit] == '1' for name, bit in self.masks}
+
     fly_mask = StateMask(
         0,
         'FLY MASK : (0) ardrone is landed, (1) ardrone is flying'
@@ -187,3 +221,31 @@ class DroneState:
         31,
         'Emergency landing : (0) no emergency, (1) emergency'
     )
+
+
+DroneState.masks = tuple(sorted(
+    (
+        (name, value.bit)
+        for name, value in vars(DroneState).items()
+        if isinstance(value, StateMask)
+    ),
+    key=lambda item: item[1],
+))
+
+
+if NUMPY:
+
+    def decode_states(states):
+        '''
+        Decodes an array of :py:attr:`Metadata.state
+        <pyardrone.navdata.options.Metadata.state>` words, e.g. a column of a
+        :py:class:`~pyardrone.navdata.recorder.NavDataRecorder`, into a dict of
+        the mask names to boolean arrays. Requires numpy.
+
+            >>> columns = decode_states(recorder['metadata.state'])
+            >>> columns['fly_mask'].mean()  # fraction of the time flying
+        '''
+        states = numpy.asarray(states, dtype=numpy.uint32)
+        bits = numpy.arange(32, dtype=numpy.uint32)
+        flags = (states[..., numpy.newaxis] >> bits & 1).astype(bool)
+        return {name: flags[..., bit] for name, bit in DroneState.masks}
@@ -0,0 +1,208 @@
+'''
+Parrot Video Encapsulation (PaVE), the framing of the video TCP stream.
+
+Each frame of the stream is a :py:class:`PaVE` header followed by
+``payload_size`` bytes of encoded video, one access unit.
+
+    >>> parser = PaVEParser()
+    >>> for frame in parser.feed(sock.recv(65536)):
+    ...     print(frame.frame_number, frame.frame_type, len(frame.payload))
+'''
+
+from ctypes import sizeof
+import ctypes
+
+from pyardrone.utils.structure import Structure
+
+
+uint8_t = ctypes.c_uint8
+uint16_t = ctypes.c_uint16
+uint32_t = ctypes.c_uint32
+
+
+# parrot_video_encapsulation_frametypes_t, values of PaVE.frame_type
+FRAME_TYPE_UNKNOWN = 0
+FRAME_TYPE_IDR_FRAME = 1
+FRAME_TYPE_I_FRAME = 2
+FRAME_TYPE_P_FRAME = 3
+FRAME_TYPE_HEADERS = 4
+
+
+class PaVE(Structure):
+
+    HEADER = b'PaVE'
+
+    signature = uint8_t * 4  #: "PaVE" - used to identify the start of frame
+    version = uint8_t  #: Version code
+    video_codec = uint8_t  #: Codec of the following frame
+    header_size = uint16_t  #: Size of the parrot_video_encapsulation_t
+    payload_size = uint32_t  #: Amount of data following this PaVE
+    encoded_stream_width = uint16_t  #: ex: 640
+    encoded_stream_height = uint16_t  #: ex: 368
+    display_width = uint16_t  #: ex: 640
+    display_height = uint16_t  #: ex: 360
+
+    frame_number = uint32_t  #: Frame position inside the current stream
+
+    timestamp = uint32_t  #: In milliseconds
+
+    total_chuncks = uint8_t
+    #: Number of UDP packets containing the current decodable payload -
+    #: currently unused
+
+    chunck_index = uint8_t
+    #: Position of the packet - first chunk is #0 - currenty unused
+
+    frame_type = uint8_t
+    #: I-frame, P-frame - parrot_video_encapsulation_frametypes_t
+
+    control = uint8_t
+    #: Special commands like end-of-stream or advertised frames
+
+    stream_byte_position_lw = uint32_t
+    #: Byte position of the current payload in the encoded stream - lower
+    #: 32-bit word
+
+    stream_byte_position_uw = uint32_t
+    #: Byte position of the current payload in the encoded stream - upper
+    #: 32-bit word
+
+    stream_id = uint16_t
+    #: This ID indentifies packets that should be recorded together
+
+    total_slices = uint8_t
+    #: number of slices composing the current frame
+
+    slice_index = uint8_t
+    #: position of the current slice in the frame
+
+    header1_size = uint8_t
+    #: H.264 only : size of SPS inside payload - no SPS present if value is
+    #: zero
+
+    header2_size = uint8_t
+    #: H.264 only : size of PPS inside payload - no PPS present if value is
+    #: zero
+
+    reserved2 = uint8_t * 2
+    #: Padding to align on 48 bytes
+
+    advertised_size = uint32_t
+    #: Size of frames announced as advertised frames
+
+    reserved3 = uint8_t * 12
+    #: Padding to align on 64 bytes
+
+
+class Frame:
+
+    '''
+    A frame of the video stream: its :py:class:`PaVE` *header* and the
+    encoded *payload*.
+    '''
+
+    __slots__ = ('header', 'payload')
+
+    def __init__(self, header, payload):
+        self.header = header
+        self.payload = payload
+
+    def __repr__(self):
+        return (
+            '{self.__class__.__name__}(frame_number={self.frame_number}, '
+            'frame_type={self.frame_type}, timestamp={self.timestamp}, '
+            'payload=<{size} bytes>)'
+        ).format(self=self, size=len(self.payload))
+
+    @property
+    def frame_number(self):
+        return self.header.frame_number
+
+    @property
+    def frame_type(self):
+        return self.header.frame_type
+
+    @property
+    def timestamp(self):
+        '''
+        In milliseconds.
+        '''
+        return self.header.timestamp
+
+    @property
+    def keyframe(self):
+        '''
+        Whether the frame can be decoded without the frames before it.
+        '''
+        return self.header.frame_type in (
+            FRAME_TYPE_IDR_FRAME, FRAME_TYPE_I_FRAME)
+
+
+class PaVEParser:
+
+    '''
+    Incremental parser splitting the video stream into :py:class:`Frame`
+    objects, whatever the boundaries of the chunks it is fed.
+
+    Frames are delimited with ``header_size`` and ``payload_size``. Bytes
+    before a ``PaVE`` signature, and headers with impossible sizes, are
+    skipped and counted in :py:attr:`discarded`.
+
+    .. attribute:: discarded
+
+        number of bytes skipped to find the next header
+    '''
+
+    #: payloads larger than this are taken as a corrupt header
+    max_payload_size = 1 << 22
+
+    def __init__(self):
+        # deleting from the front of a bytearray does not move its content,
+        # so it serves as a ring buffer which grows as needed
+        self._buffer = bytearray()
+        self.discarded = 0
+
+    def __len__(self):
+        '''
+        Returns the number of bytes buffered, waiting for the rest of their
+        frame.
+        '''
+        return len(self._buffer)
+
+    def feed(self, data):
+        '''
+        Appends *data* to the stream, and returns the list of frames
+        completed by it.
+        '''
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        while True:
+            start = buffer.find(PaVE.HEADER)
+            if start < 0:
+                # the last bytes may be the beginning of a signature
+                self._discard(len(buffer) - len(PaVE.HEADER) + 1)
+                break
+            self._discard(start)
+            if len(buffer) < sizeof(PaVE):
+                break
+            header = PaVE.from_buffer_copy(buffer)
+            if (
+                header.header_size < sizeof(PaVE) or
+                header.payload_size > self.max_payload_size
+            ):
+                self._discard(len(PaVE.HEADER))
+                continue
+            end = header.header_size + header.payload_size
+            if len(buffer) < end:
+                break
+            with memoryview(buffer) as view:
+                payload = bytes(view[header.header_size:end])
+            frames.append(Frame(header, payload))
+            del buffer[:end]
+        return frames
+
+    def _discard(self, size):
+        if size > 0:
+            self.discarded += size
+            del self._buffer[:size]
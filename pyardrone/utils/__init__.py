@@ -5,7 +5,6 @@ Utility functions
 
 
 import struct
-import time
 
 
 def repack_to_int(value):
@@ -49,12 +48,13 @@ def every(secs):
         ...     print('Hello')
 
     You get ``Hello`` output every 0.1 seconds.
+
+    Ticks are scheduled against absolute deadlines, so they do not drift;
+    use :py:class:`~pyardrone.utils.timing.Ticker` directly for missed tick
+    and lateness accounting.
     '''
-    time_stated = time.monotonic()
-    while True:
-        time_yielded = time.monotonic()
-        yield time_yielded - time_stated
-        time.sleep(max(0, secs + time_yielded - time.monotonic()))
+    from pyardrone.utils.timing import Ticker
+    yield from Ticker(secs)
 
 
 def get_free_udp_port():
@@ -1,5 +1,11 @@
 import logging
 import collections
+import string
+
+
+# unlike str.format(**kwargs), only looks up the keys used by the format, so
+# that the others, like exc_info, are left to the logger
+_formatter = string.Formatter()
 
 
 class MessageDict(collections.UserDict):
@@ -14,7 +20,7 @@ class MessageDict(collections.UserDict):
 class Message(str):
 
     def __new__(self, fmt, args, kwargs):
-        return fmt.format(*args, **kwargs)
+        return _formatter.vformat(fmt, args, kwargs)
 
     def __repr__(self):
         return '{}({})'.format(self.__class__.__name__, self)
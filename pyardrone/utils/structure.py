@@ -34,6 +34,43 @@ class StructureNamespace(dict):
             super().__setitem__(key, value)
 
 
+def iter_fields(structure):
+    '''
+    Yields the ``(name, type)`` pairs of all fields of the ctypes *structure*,
+    including those inherited from its bases.
+    '''
+    for cls in reversed(structure.mro()):
+        yield from cls.__dict__.get('_fields_', ())
+
+
+def ctype_to_dtype(ctype):
+    '''
+    Returns the :py:class:`numpy.dtype` equivalent to the ctypes type *ctype*.
+
+    Field offsets of structures are taken from ctypes, so ``_pack_`` is
+    respected; arrays, including nested ones, become subarrays.
+    '''
+    if issubclass(ctype, ctypes.Array):
+        base = ctype_to_dtype(ctype._type_)
+        if base.subdtype is None:
+            return numpy.dtype((base, (ctype._length_,)))
+        base, shape = base.subdtype
+        return numpy.dtype((base, (ctype._length_,) + shape))
+    if issubclass(ctype, ctypes.Structure):
+        names, formats, offsets = [], [], []
+        for name, field_type in iter_fields(ctype):
+            names.append(name)
+            formats.append(ctype_to_dtype(field_type))
+            offsets.append(getattr(ctype, name).offset)
+        return numpy.dtype({
+            'names': names,
+            'formats': formats,
+            'offsets': offsets,
+            'itemsize': ctypes.sizeof(ctype),
+        })
+    return numpy.dtype(ctype)
+
+
 class StructureMeta(_ctypes_StrcutureMeta):
 
     @classmethod
@@ -43,6 +80,23 @@ class StructureMeta(_ctypes_StrcutureMeta):
     def __new__(cls, name, bases, namespace):
         return _ctypes_StrcutureMeta.__new__(cls, name, bases, dict(namespace))
 
+    if NUMPY:
+        @property
+        def dtype(cls):
+            '''
+            The equivalent numpy structured :py:class:`numpy.dtype`,
+            which can be used to decode many structures at once::
+
+                numpy.frombuffer(buffer, Demo.dtype).view(numpy.recarray)
+
+            Only available if numpy is installed.
+            '''
+            try:
+                return cls.__dict__['_dtype']
+            except KeyError:
+                cls._dtype = ctype_to_dtype(cls)
+                return cls._dtype
+
 
 class Structure(ctypes.Structure, metaclass=StructureMeta):
 
@@ -0,0 +1,194 @@
+'''
+Periodic timers scheduled against absolute deadlines.
+'''
+
+import bisect
+import ctypes
+import ctypes.util
+import errno
+import math
+import sys
+import time
+
+from pyardrone.utils.structure import Structure
+
+
+CLOCK_MONOTONIC = 1  # the clock of time.monotonic() on Linux
+TIMER_ABSTIME = 1
+
+
+class _timespec(Structure):
+
+    tv_sec = ctypes.c_long
+    tv_nsec = ctypes.c_long
+
+
+def _load_clock_nanosleep():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        function = libc.clock_nanosleep
+    except (OSError, AttributeError, TypeError):
+        return None
+    function.argtypes = [
+        ctypes.c_int, ctypes.c_int,
+        ctypes.POINTER(_timespec), ctypes.POINTER(_timespec),
+    ]
+    function.restype = ctypes.c_int
+    return function
+
+
+_clock_nanosleep = _load_clock_nanosleep()
+
+#: whether :py:func:`sleep_until` can use ``clock_nanosleep``
+PRECISE_SLEEP = _clock_nanosleep is not None
+
+
+def sleep_until(deadline, precise=False):
+    '''
+    Sleeps until :py:func:`time.monotonic` reaches *deadline*.
+
+    If *precise* is true and :py:data:`PRECISE_SLEEP` is available, sleeps
+    with ``clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME)``, which wakes at
+    the absolute deadline instead of after a relative delay. If it fails,
+    sleeps with :py:func:`time.sleep` instead.
+    '''
+    if precise and _clock_nanosleep is not None:
+        fraction, seconds = math.modf(deadline)
+        request = _timespec(int(seconds), int(fraction * 1e9))
+        # returns EINTR if interrupted by a signal handler
+        error = errno.EINTR
+        while error == errno.EINTR:
+            error = _clock_nanosleep(
+                CLOCK_MONOTONIC, TIMER_ABSTIME, request, None)
+        if not error:
+            return
+    time.sleep(max(0, deadline - time.monotonic()))
+
+
+class Histogram:
+
+    '''
+    Histogram of durations in seconds, with fixed bucket *edges*.
+
+    ``counts[i]`` is the number of values less than ``edges[i]`` and not
+    less than ``edges[i - 1]``; the last count is of values not less than
+    the last edge.
+    '''
+
+    #: default bucket edges, from 100 microseconds to 50 milliseconds
+    default_edges = (1e-4, 5e-4, 1e-3, 2e-3, 5e-3, 1e-2, 2e-2, 5e-2)
+
+    def __init__(self, edges=default_edges):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.mean = 0.0
+        self.max = 0.0
+        self._m2 = 0.0
+
+    def __repr__(self):
+        return (
+            '{self.__class__.__name__}(count={self.count}, '
+            'mean={self.mean:.6f}, max={self.max:.6f}, std={self.std:.6f}, '
+            'counts={self.counts})'
+        ).format(self=self)
+
+    def add(self, value):
+        '''
+        Adds *value* to the histogram.
+        '''
+        self.counts[bisect.bisect_right(self.edges, value)] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+        # Welford's online variance
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self):
+        '''
+        Standard deviation of the values.
+        '''
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+
+class Ticker:
+
+    '''
+    Iterable yielding every *period* seconds, the time since the first tick.
+
+    Ticks are scheduled against absolute deadlines ``start + n * period``, so
+    time spent between ticks does not accumulate into drift.
+
+    If the loop falls behind by a whole period or more, the missed ticks are
+    skipped and counted in :py:attr:`missed` if *skip_missed* is true;
+    otherwise they are run as soon as possible, to catch up.
+
+        >>> ticker = Ticker(1 / 30)
+        >>> for elapsed in ticker:
+        ...     control(drone)
+        >>> ticker.missed, ticker.lateness
+        (0, Histogram(count=1800, mean=0.000080, max=0.000412, ...))
+
+    :param period: seconds between ticks
+    :param skip_missed: whether to skip missed ticks
+    :param precise: sleep with ``clock_nanosleep`` if available, see
+                    :py:func:`sleep_until`
+    :param sleep: a function sleeping the given number of seconds, used
+                  instead of :py:func:`sleep_until`; if it returns true, the
+                  iteration stops, so :py:meth:`threading.Event.wait` makes
+                  an interruptible ticker
+    :param clock: a function returning the current time in seconds;
+                  :py:func:`sleep_until` follows :py:func:`time.monotonic`,
+                  so a *sleep* function following *clock* has to be given
+                  with it
+
+    .. attribute:: ticks
+
+        number of ticks run
+
+    .. attribute:: missed
+
+        number of ticks skipped
+
+    .. attribute:: lateness
+
+        :py:class:`Histogram` of the delay between the deadline of each tick
+        and the time it was run
+    '''
+
+    def __init__(
+            self, period, *,
+            skip_missed=True, precise=False, sleep=None, clock=time.monotonic):
+        self.period = period
+        self.skip_missed = skip_missed
+        self.precise = precise
+        self.sleep = sleep
+        self.clock = clock
+        self.ticks = 0
+        self.missed = 0
+        self.lateness = Histogram()
+
+    def __iter__(self):
+        clock = self.clock
+        start = deadline = clock()
+        while True:
+            now = clock()
+            self.ticks += 1
+            self.lateness.add(now - deadline)
+            yield now - start
+            deadline += self.period
+            now = clock()
+            if self.skip_missed and now - deadline >= self.period:
+                missed = int((now - deadline) // self.period)
+                self.missed += missed
+                deadline += missed * self.period
+            if self.sleep is None:
+                sleep_until(deadline, self.precise)
+            elif self.sleep(max(0, deadline - clock())):
+                return
@@ -1,111 +1,578 @@
-from pyardrone.utils.structure import Structure
+from pyardrone.pave import PaVE, PaVEParser  # noqa: F401, PaVE moved
 from pyardrone.utils import get_free_udp_port, logging
+from pyardrone.utils.structure import NUMPY
+from pyardrone.utils.timing import Histogram
 from pyardrone.abc import BaseClient
-import ctypes
+import asyncio
+import collections
+import contextlib
 import socket
 import threading
+import time
 
-import cv2
+if NUMPY:
+    import numpy
+
+try:
+    import av
+except ImportError:
+    AV = False
+else:
+    AV = True
+
+try:
+    import cv2
+except ImportError:
+    OPENCV = False
+else:
+    OPENCV = True
 
 
 logger = logging.getLogger(__name__)
 
 
-uint8_t = ctypes.c_int8
-uint16_t = ctypes.c_int16
-uint32_t = ctypes.c_int32
+class AVDecoder:
+
+    '''
+    Decodes H.264 payloads in-process with PyAV.
+    '''
+
+    def __init__(self):
+        self.codec = av.CodecContext.create('h264', 'r')
+
+    def decode(self, payload, pool=None):
+        '''
+        Yields the images decoded from *payload*, in opencv's format.
+        Payloads which fail to decode are logged and dropped.
+
+        If a :py:class:`FramePool` is given, the images are copied into its
+        buffers, which readers can hold without copying them again. Each
+        image has to be published before the next one is requested, as
+        buffers are written least recently published first. The
+        conversion to bgr24 still allocates a frame per image, PyAV cannot
+        convert into an existing buffer.
+        '''
+        try:
+            frames = self.codec.decode(av.Packet(payload))
+        except av.error.FFmpegError as exc:
+            logger.warning('failed to decode video frame: {!r}', exc)
+            return
+        for frame in frames:
+            if pool is None:
+                yield frame.to_ndarray(format='bgr24')
+                continue
+            frame = frame.reformat(format='bgr24')
+            buffer = pool.writable((frame.height, frame.width, 3))
+            if buffer is None:
+                continue
+            plane = frame.planes[0]
+            # rows of the plane may be padded
+            rows = numpy.frombuffer(plane, numpy.uint8).reshape(
+                frame.height, plane.line_size)
+            buffer.reshape(frame.height, -1)[...] = (
+                rows[:, :frame.width * 3])
+            yield buffer
+
+
+class FramePool:
+
+    '''
+    A fixed pool of preallocated image buffers, shared by one thread
+    decoding frames and any number of threads reading them. Requires numpy.
+
+    The decoding thread writes each frame into a buffer from
+    :py:meth:`writable` and makes it the latest with :py:meth:`publish`.
+    Readers hold the latest frame with :py:meth:`acquire`; held buffers are
+    not written until released, so they are stable without being copied:
+
+        >>> with pool.acquire() as frame:
+        ...     process(frame)
+
+    Other buffers are written least recently published first, so a frame
+    which is not held stays intact while the others are rewritten.
+    If every buffer is published or held, frames are dropped and counted in
+    :py:attr:`exhausted`.
+
+    :param size: number of buffers, at least 3 so that one can be written
+                 while one is published and one is held.
+
+    .. attribute:: exhausted
+
+        number of frames dropped for want of a buffer
+    '''
+
+    def __init__(self, size=3):
+        self.size = size
+        self.exhausted = 0
+        self._lock = threading.Lock()
+        self._buffers = []
+        self._published = None
+        # id of buffer -> number of holds on it
+        self._holds = collections.Counter()
+
+    def writable(self, shape, dtype='uint8'):
+        '''
+        Returns the least recently published buffer of *shape* and *dtype*
+        which is neither published nor held, or ``None`` if there is none.
+        Buffers are reallocated if the shape changes.
+        '''
+        with self._lock:
+            if (
+                not self._buffers or
+                self._buffers[0].shape != shape or
+                self._buffers[0].dtype != dtype
+            ):
+                # held buffers are left to their readers
+                self._buffers = [
+                    numpy.empty(shape, dtype) for _ in range(self.size)]
+            for buffer in self._buffers:
+                if (
+                    buffer is not self._published and
+                    not self._holds[id(buffer)]
+                ):
+                    return buffer
+            self.exhausted += 1
+            return None
+
+    def publish(self, image):
+        '''
+        Makes *image* the latest frame. It is usually a buffer from
+        :py:meth:`writable`; other arrays are published but never reused.
+        '''
+        with self._lock:
+            self._published = image
+            # keeps the buffers ordered from the least recently published
+            for index, buffer in enumerate(self._buffers):
+                if buffer is image:
+                    self._buffers.append(self._buffers.pop(index))
+                    break
+
+    @property
+    def latest(self):
+        '''
+        The latest frame, or ``None``. It may be overwritten later; use
+        :py:meth:`acquire` to hold it.
+        '''
+        return self._published
+
+    @contextlib.contextmanager
+    def acquire(self):
+        '''
+        Returns a context manager holding the latest frame, or ``None``, so
+        that it is not overwritten within it.
+        '''
+        with self._lock:
+            image = self._published
+            self._holds[id(image)] += 1
+        try:
+            yield image
+        finally:
+            self.release(image)
+
+    def hold(self, image):
+        '''
+        Holds *image* so that it is not written until :py:meth:`release` is
+        called as many times as it was held.
+        '''
+        with self._lock:
+            self._holds[id(image)] += 1
+
+    def release(self, image):
+        '''
+        Releases a hold on *image* from :py:meth:`hold`.
+        '''
+        with self._lock:
+            self._holds[id(image)] -= 1
+            if not self._holds[id(image)]:
+                del self._holds[id(image)]
+
 
+class LatencyBoundedQueue:
 
-class PaVE(Structure):
+    '''
+    Queue of :py:class:`~pyardrone.pave.Frame` between the thread receiving
+    the video stream and the thread decoding it, which bounds the latency of
+    the decoded frames.
 
-    HEADER = b'PaVE'
+    The latency of a frame is estimated from its ``timestamp``, relative to
+    the frame which arrived the soonest after being timestamped; it is the
+    delay in excess of the lowest transport delay seen.
 
-    signature = uint8_t * 4  #: "PaVE" - used to identify the start of frame
-    version = uint8_t  #: Version code
-    video_codec = uint8_t  #: Codec of the following frame
-    header_size = uint16_t  #: Size of the parrot_video_encapsulation_t
-    payload_size = uint32_t  #: Amount of data following this PaVE
-    encoded_stream_width = uint16_t  #: ex: 640
-    encoded_stream_height = uint16_t  #: ex: 368
-    display_width = uint16_t  #: ex: 640
-    display_height = uint16_t  #: ex: 360
+    When the frame to be decoded is late by more than *max_latency*
+    seconds, the frames before the newest queued keyframe are dropped. If no
+    keyframe is queued, all queued frames are dropped, and so are the
+    following ones, until a keyframe arrives: P-frames cannot be decoded
+    without the frames they follow.
 
-    frame_number = uint32_t  #: Frame position inside the current stream
+    .. attribute:: dropped
 
-    timestamp = uint32_t  #: In milliseconds
+        number of frames dropped
 
-    total_chuncks = uint8_t
-    #: Number of UDP packets containing the current decodable payload -
-    #: currently unused
+    .. attribute:: latency
 
-    chunck_index = uint8_t
-    #: Position of the packet - first chunk is #0 - currenty unused
+        :py:class:`~pyardrone.utils.timing.Histogram` of the latencies of
+        the frames returned by :py:meth:`get`, in seconds
+    '''
 
-    frame_type = uint8_t
-    #: I-frame, P-frame - parrot_video_encapsulation_frametypes_t
+    latency_edges = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2)
+
+    def __init__(self, max_latency, *, clock=time.monotonic):
+        self.max_latency = max_latency
+        self.clock = clock
+        self.dropped = 0
+        self.latency = Histogram(self.latency_edges)
+        self.closed = False
+        self._frames = collections.deque()
+        self._condition = threading.Condition()
+        # local clock minus drone clock, in seconds
+        self._offset = None
+        self._resync = False
+
+    def latency_of(self, frame):
+        '''
+        Returns the estimated latency of *frame*, in seconds.
+        '''
+        return self.clock() - frame.timestamp / 1000 - self._offset
 
-    control = uint8_t
-    #: Special commands like end-of-stream or advertised frames
+    def put(self, frame):
+        '''
+        Queues *frame*, or drops it while waiting for a keyframe.
+        '''
+        offset = self.clock() - frame.timestamp / 1000
+        with self._condition:
+            if self._offset is None or offset < self._offset:
+                self._offset = offset
+            if self._resync:
+                if not frame.keyframe:
+                    self.dropped += 1
+                    return
+                self._resync = False
+            self._frames.append(frame)
+            self._condition.notify()
+
+    def get(self):
+        '''
+        Blocks until a frame is available and returns it, or returns
+        ``None`` once the queue is closed.
+        '''
+        frames = self._frames
+        with self._condition:
+            while True:
+                self._condition.wait_for(lambda: frames or self.closed)
+                if self.closed:
+                    return None
+                if self.latency_of(frames[0]) <= self.max_latency:
+                    break
+                keyframes = [
+                    i for i, frame in enumerate(frames) if frame.keyframe]
+                if keyframes:
+                    self._drop(keyframes[-1])
+                    break
+                self._drop(len(frames))
+                self._resync = True
+            frame = frames.popleft()
+        self.latency.add(self.latency_of(frame))
+        return frame
+
+    def close(self):
+        '''
+        Wakes up :py:meth:`get`, which returns ``None`` from then on.
+        '''
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
 
-    stream_byte_position_lw = uint32_t
-    #: Byte position of the current payload in the encoded stream - lower
-    #: 32-bit word
+    def _drop(self, count):
+        for _ in range(count):
+            self._frames.popleft()
+        self.dropped += count
 
-    stream_byte_position_uw = uint32_t
-    #: Byte position of the current payload in the encoded stream - upper
-    #: 32-bit word
 
-    stream_id = uint16_t
-    #: This ID indentifies packets that should be recorded together
+class DecodedFrame:
 
-    total_slices = uint8_t
-    #: number of slices composing the current frame
+    '''
+    A decoded *image*, in opencv's format, with the
+    :py:class:`~pyardrone.pave.PaVE` *header* of its encoded frame, or
+    ``None`` if the decoder does not tell which frame it is.
+    '''
+
+    __slots__ = ('image', 'header')
+
+    def __init__(self, image, header=None):
+        self.image = image
+        self.header = header
+
+    def __repr__(self):
+        return '{}(image=<{}>, frame_number={})'.format(
+            self.__class__.__name__,
+            'x'.join(map(str, getattr(self.image, 'shape', ()))),
+            None if self.header is None else self.header.frame_number,
+        )
 
-    slice_index = uint8_t
-    #: position of the current slice in the frame
 
-    header1_size = uint8_t
-    #: H.264 only : size of SPS inside payload - no SPS present if value is
-    #: zero
+class FrameSubscription:
 
-    header2_size = uint8_t
-    #: H.264 only : size of PPS inside payload - no PPS present if value is
-    #: zero
+    '''
+    A bounded queue delivering each decoded frame once, as
+    :py:class:`DecodedFrame`; when it is full, the oldest frame is dropped.
+    Created by :py:meth:`VideoClient.subscribe_frames`.
 
-    reserved2 = uint8_t * 2
-    #: Padding to align on 48 bytes
+    It can be iterated until it is closed, also with ``async for``:
 
-    advertised_size = uint32_t
-    #: Size of frames announced as advertised frames
+        >>> with client.subscribe_frames(maxsize=1) as frames:
+        ...     for frame in frames:
+        ...         track(frame.image)
 
-    reserved3 = uint8_t * 12
-    #: Padding to align on 64 bytes
+    With a :py:class:`FramePool`, the images of queued frames are held in
+    it until they are returned, dropped, or the subscription is closed.
+
+    .. attribute:: dropped
+
+        number of frames dropped because the queue was full
+    '''
+
+    def __init__(self, client, maxsize):
+        self.client = client
+        self.pool = client.frame_pool
+        self.dropped = 0
+        self.closed = False
+        self._frames = collections.deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        # called after each put and on close, by asynchronous iterators
+        self._wakers = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def put(self, frame):
+        '''
+        Queues *frame*, dropping the oldest one if the queue is full.
+        '''
+        with self._condition:
+            if self.closed:
+                return
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+                self._release(self._frames.popleft())
+            if self.pool is not None:
+                self.pool.hold(frame.image)
+            self._frames.append(frame)
+            self._condition.notify()
+        self._wake()
+
+    def get(self, timeout=None):
+        '''
+        Removes and returns the oldest frame, blocking until there is one;
+        returns ``None`` after *timeout* seconds or once closed.
+        '''
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frames or self.closed, timeout)
+            if self._frames and not self.closed:
+                return self._pop()
+            return None
+
+    def close(self):
+        '''
+        Stops the delivery of frames and wakes the consumers up.
+        '''
+        with self._condition:
+            self.closed = True
+            while self._frames:
+                self._pop()
+            self._condition.notify_all()
+        self.client._unsubscribe(self)
+        self._wake()
+
+    def __iter__(self):
+        while True:
+            frame = self.get()
+            if frame is None:
+                return
+            yield frame
+
+    def __aiter__(self):
+        return AsyncFrameIterator(self)
+
+    def _pop(self):
+        # with the condition held
+        frame = self._frames.popleft()
+        self._release(frame)
+        return frame
+
+    def _release(self, frame):
+        if self.pool is not None:
+            self.pool.release(frame.image)
+
+    def _wake(self):
+        for wake in self._wakers:
+            wake()
+
+
+class AsyncFrameIterator:
+
+    '''
+    Asynchronous iterator over a :py:class:`FrameSubscription`, returned by
+    its ``__aiter__``; has to be used from a single event loop.
+    '''
+
+    def __init__(self, subscription):
+        self.subscription = subscription
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        with subscription._condition:
+            subscription._wakers += (self._wake,)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        subscription = self.subscription
+        while True:
+            # cleared before polling, so that a frame put in between sets it
+            # again
+            self._ready.clear()
+            with subscription._condition:
+                if subscription.closed:
+                    subscription._wakers = tuple(
+                        wake for wake in subscription._wakers
+                        if wake != self._wake)
+                    raise StopAsyncIteration
+                if subscription._frames:
+                    return subscription._pop()
+            await self._ready.wait()
+
+    def _wake(self):
+        # called from the decoding thread
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._ready.set)
 
 
 class VideoClient(BaseClient):
     '''
     Independent ARDrone Video Client
+
+    :param host: address of the drone
+    :param video_port: video port
+    :param redirect_port: local UDP port of the ``'relay'`` decoder
+    :param decoder: ``'av'`` to decode the frames in-process with PyAV, or
+                    ``'relay'`` to redirect the stream to a local UDP port
+                    read by ``cv2.VideoCapture``; defaults to
+                    ``'av'`` if PyAV is installed.
+    :param max_latency: with the ``'av'`` decoder, decode the frames in a
+                        separate thread and skip to the next keyframe
+                        when the frame to decode is late by more than
+                        *max_latency* seconds, see
+                        :py:class:`LatencyBoundedQueue`
+    :param pool_size: decode the frames into a :py:class:`FramePool` of
+                      *pool_size* buffers, see :py:meth:`acquire_frame`
+
+    .. attribute:: frame_queue
+
+        The :py:class:`LatencyBoundedQueue` if *max_latency* is set, which
+        counts the dropped frames and the latency, or ``None``.
     '''
 
-    def __init__(self, host, video_port, redirect_port=None):
+    #: size of the datagrams the encoded stream is redirected in
+    redirect_chunk_size = 4096
+
+    def __init__(
+        self,
+        host,
+        video_port,
+        redirect_port=None,
+        *,
+        decoder=None,
+        max_latency=None,
+        pool_size=None
+    ):
+        if decoder is None:
+            decoder = 'av' if AV else 'relay'
+        if decoder == 'av' and not AV:
+            raise RuntimeError('the av decoder requires PyAV')
+        if decoder == 'relay' and not OPENCV:
+            raise RuntimeError('the relay decoder requires opencv')
+        if decoder not in ('av', 'relay'):
+            raise ValueError('unknown decoder: {!r}'.format(decoder))
+        if max_latency is not None and decoder != 'av':
+            raise ValueError('max_latency requires the av decoder')
         self.host = host
         self.video_port = video_port
         self.redirect_port = redirect_port
+        self.decoder = decoder
+        if max_latency is None:
+            self.frame_queue = None
+        else:
+            self.frame_queue = LatencyBoundedQueue(max_latency)
+        if pool_size is None:
+            self.frame_pool = None
+        else:
+            self.frame_pool = FramePool(pool_size)
         self.video_ready = threading.Event()
+        # notified on each decoded frame and on close
+        self._condition = threading.Condition()
+        self._frame_count = 0
+        # the latest DecodedFrame, replaced under the condition so that its
+        # image and header always match
+        self._latest = None
+        self._subscriptions = ()
 
     def _video_client_job(self):
         rsock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         rsock.connect((self.host, self.video_port))
         logger.info(
             'Connected to video port {}'.format(self.host, self.video_port))
-        ssock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        ssock = None
+        if self.frame_queue is not None:
+            handle = self.frame_queue.put
+        elif self.decoder == 'av':
+            decoder = AVDecoder()
+
+            def handle(frame):
+                self._decode(decoder, frame)
+        else:
+            ssock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+            def handle(frame):
+                self._redirect(ssock, frame.payload)
+        parser = PaVEParser()
         while not self.closed:
-            data = rsock.recv(4096)
-            if data.startswith(PaVE.HEADER):
-                data = data[ctypes.sizeof(PaVE):]
-            ssock.sendto(data, ('localhost', self.redirect_port))
+            data = rsock.recv(65536)
+            if not data:
+                break
+            for frame in parser.feed(data):
+                self.pave_frame_received(frame)
+                handle(frame)
         rsock.close()
-        ssock.close()
+        if ssock is not None:
+            ssock.close()
+
+    def _video_decoder_job(self):
+        decoder = AVDecoder()
+        while True:
+            frame = self.frame_queue.get()
+            if frame is None:
+                return
+            self._decode(decoder, frame)
+
+    def _decode(self, decoder, frame):
+        for im in decoder.decode(frame.payload, self.frame_pool):
+            self.frame_recieved(im, frame.header)
+            self.video_ready.set()
+
+    def _redirect(self, ssock, payload):
+        # the payload of a frame may not fit into one datagram
+        for start in range(0, len(payload), self.redirect_chunk_size):
+            ssock.sendto(
+                payload[start:start + self.redirect_chunk_size],
+                ('localhost', self.redirect_port)
+            )
 
     def _video_opencv_job(self):
         capture = cv2.VideoCapture(
@@ -113,32 +580,133 @@ class VideoClient(BaseClient):
         )
         logger.info('initiated VideoCapture at port {}'.format(
             self.redirect_port))
+        buffer = None
         while not self.closed:
-            ret, im = capture.read()
+            if buffer is None:
+                ret, im = capture.read()
+            else:
+                # reused by opencv if it has the right shape
+                ret, im = capture.read(buffer)
             self.frame_recieved(im)
             self.video_ready.set()
+            if self.frame_pool is not None and im is not None:
+                buffer = self.frame_pool.writable(im.shape, im.dtype)
 
     def _connect(self):
-        if self.redirect_port is None:
-            self.redirect_port = get_free_udp_port()
-            logger.info('Selected free udp port {}'.format(self.redirect_port))
         self._video_client_thread = threading.Thread(
             target=self._video_client_job,
             daemon=True
         )
+        self._video_client_thread.start()
+        if self.frame_queue is not None:
+            self._video_decoder_thread = threading.Thread(
+                target=self._video_decoder_job,
+                daemon=True
+            )
+            self._video_decoder_thread.start()
+        if self.decoder == 'av':
+            return
+
+        if self.redirect_port is None:
+            self.redirect_port = get_free_udp_port()
+            logger.info('Selected free udp port {}'.format(self.redirect_port))
         self._video_opencv_thread = threading.Thread(
             target=self._video_opencv_job,
             daemon=True
         )
-
-        self._video_client_thread.start()
         self._video_opencv_thread.start()
 
     def _close(self):
-        pass
-
-    def frame_recieved(self, im):
+        if self.frame_queue is not None:
+            self.frame_queue.close()
+        for subscription in self._subscriptions:
+            subscription.close()
+        with self._condition:
+            self._condition.notify_all()
+
+    def frame_recieved(self, im, header=None):
+        '''
+        Called with each decoded image and the
+        :py:class:`~pyardrone.pave.PaVE` header of its frame, if known.
+        '''
         self.frame = im
+        if self.frame_pool is not None:
+            self.frame_pool.publish(im)
+        decoded = DecodedFrame(im, header)
+        for subscription in self._subscriptions:
+            subscription.put(decoded)
+        with self._condition:
+            self._latest = decoded
+            self._frame_count += 1
+            self._condition.notify_all()
+
+    def wait_next_frame(self, timeout=None):
+        '''
+        Blocks until the next frame is decoded and returns it as a
+        :py:class:`DecodedFrame`, or returns ``None`` after *timeout*
+        seconds.
+
+        With a :py:class:`FramePool`, its image is not held; it is rewritten
+        once the other free buffers have been used.
+
+        :raises RuntimeError: if the client is closed.
+        '''
+        with self._condition:
+            count = self._frame_count
+            self._condition.wait_for(
+                lambda: self._frame_count != count or self.closed, timeout)
+            if self.closed:
+                raise RuntimeError(
+                    '{} is closed already'.format(self.__class__.__name__))
+            if self._frame_count == count:
+                return None
+            return self._latest
+
+    def subscribe_frames(self, maxsize=1):
+        '''
+        Returns a :py:class:`FrameSubscription` receiving each frame decoded
+        from now on, which keeps the latest *maxsize* frames.
+
+        With a :py:class:`FramePool`, queued frames hold their images in
+        it; frames are dropped while it has no other buffer, so it should be
+        larger than *maxsize*, plus the frames held otherwise.
+        '''
+        subscription = FrameSubscription(self, maxsize)
+        with self._condition:
+            # replaced, never mutated, so that the decoding thread can
+            # iterate it without the lock
+            self._subscriptions += (subscription,)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._condition:
+            self._subscriptions = tuple(
+                s for s in self._subscriptions if s is not subscription)
+
+    def acquire_frame(self):
+        '''
+        Returns a context manager holding the latest frame, so that it is
+        not overwritten within it; without a :py:class:`FramePool`, frames
+        are never overwritten.
+
+            >>> with client.acquire_frame() as frame:
+            ...     cv2.imshow('im', frame)
+        '''
+        if self.frame_pool is not None:
+            return self.frame_pool.acquire()
+        return _hold(getattr(self, 'frame', None))
+
+    def pave_frame_received(self, frame):
+        '''
+        Called with each :py:class:`~pyardrone.pave.Frame` of the stream,
+        before it is decoded.
+        '''
+        self.pave_frame = frame
+
+
+@contextlib.contextmanager
+def _hold(image):
+    yield image
 
 
 class VideoMixin:
@@ -146,9 +714,23 @@ class VideoMixin:
     Mixin of ARDrone that provides video functionality
     '''
 
+    #: *decoder* of the :py:class:`VideoClient`
+    video_decoder = None
+
+    #: *max_latency* of the :py:class:`VideoClient`
+    video_max_latency = None
+
+    #: *pool_size* of the :py:class:`VideoClient`
+    video_pool_size = None
+
     def _connect(self):
         super()._connect()
-        self.video_client = VideoClient(self.host, self.video_port)
+        self.video_client = VideoClient(
+            self.host, self.video_port,
+            decoder=self.video_decoder,
+            max_latency=self.video_max_latency,
+            pool_size=self.video_pool_size,
+        )
         self.video_client.connect()
 
     def _close(self):
@@ -162,6 +744,24 @@ class VideoMixin:
         '''
         return self.video_client.frame
 
+    def acquire_frame(self):
+        '''
+        See :py:meth:`VideoClient.acquire_frame`.
+        '''
+        return self.video_client.acquire_frame()
+
+    def wait_next_frame(self, timeout=None):
+        '''
+        See :py:meth:`VideoClient.wait_next_frame`.
+        '''
+        return self.video_client.wait_next_frame(timeout)
+
+    def subscribe_frames(self, maxsize=1):
+        '''
+        See :py:meth:`VideoClient.subscribe_frames`.
+        '''
+        return self.video_client.subscribe_frames(maxsize)
+
     @property
     def video_ready(self):
         '''
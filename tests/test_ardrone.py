@@ -1,3 +1,4 @@
+import types
 import unittest
 import pyardrone
 
@@ -20,3 +21,22 @@ class ARDroneConnectExceptionTest(unittest.TestCase):
         self.drone.close()
         with self.assertRaises(RuntimeError):
             self.drone.connect()
+
+
+class ARDroneStateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.drone = pyardrone.ARDrone(connect=False)
+        self.drone.navdata_client = types.SimpleNamespace()
+
+    def set_state(self, state):
+        self.drone.navdata_client.navdata = types.SimpleNamespace(
+            metadata=types.SimpleNamespace(state=state))
+
+    def test_state_is_cached_per_navdata(self):
+        self.set_state(1)
+        state = self.drone.state
+        self.assertTrue(state.fly_mask)
+        self.assertIs(self.drone.state, state)
+        self.set_state(0)
+        self.assertFalse(self.drone.state.fly_mask)
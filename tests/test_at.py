@@ -1,6 +1,10 @@
+import asyncio
 import enum
+import socket
+import threading
 import unittest
 from pyardrone import at
+from pyardrone.at.aio import AsyncATClient
 from pyardrone.at import parameters, base
 from pyardrone.utils import repack_to_int
 
@@ -63,6 +67,44 @@ class CommandTest(unittest.TestCase):
         )
 
 
+class CompiledPackTest(unittest.TestCase):
+
+    def assertPackEqual(self, command):
+        for seq in (1, 65535, 'SEQUNSET'):
+            self.assertEqual(command._pack(seq), command._pack_generic(seq))
+
+    def test_commands(self):
+        self.assertPackEqual(at.REF(at.REF.input.start))
+        self.assertPackEqual(at.PCMD(at.PCMD.flag.progressive, 0.1, -0.8, 1))
+        self.assertPackEqual(at.PCMD_MAG(1, 0, 0.5, -0.5, 1, -1, 0.25))
+        self.assertPackEqual(at.FTRIM())
+        self.assertPackEqual(at.CONFIG('general:navdata_demo', True))
+        self.assertPackEqual(at.CONFIG('a:b', 3.5))
+        self.assertPackEqual(at.CONFIG_IDS('a', b'b', 1))
+        self.assertPackEqual(at.COMWDG())
+        self.assertPackEqual(at.CALIB(0))
+        self.assertPackEqual(at.CTRL(at.CTRL.mode.CFG_GET_CONTROL_MODE))
+
+    def test_float_given_as_int(self):
+        self.assertPackEqual(at.PCMD(0, 1, 0, -1, 0))
+
+    def test_custom_parameter(self):
+        class Hex(parameters.Parameter):
+            @staticmethod
+            def _pack(value):
+                return hex(value).encode()
+
+        class CUSTOM(base.ATCommand):
+            value = Hex()
+            speed = parameters.Float()
+
+        self.assertEqual(
+            CUSTOM(255, 0.5)._pack(3),
+            b'AT*CUSTOM=3,0xff,%d\r' % repack_to_int(0.5),
+        )
+        self.assertPackEqual(CUSTOM(255, 0.5))
+
+
 class CommandDefaultTest(unittest.TestCase):
 
     class FOO(base.ATCommand):
@@ -225,5 +267,122 @@ class AtREFDefaults(unittest.TestCase):
         )
 
 
+class ATClientBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(1)
+        self.client = at.ATClient(
+            *self.server.getsockname(), watchdog_interval=60)
+        self.client.connect()
+        self.assertEqual(self.server.recv(1024), b'AT*COMWDG=1\r')
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def test_batch(self):
+        with self.client.batch():
+            self.client.send(at.FTRIM())
+            self.client.send(at.REF_0_5(20))
+            self.client.send(at.COMWDG())
+        self.assertEqual(
+            self.server.recv(1024),
+            b'AT*FTRIM=2\rAT*REF=3,20\rAT*COMWDG=4\r')
+
+    def test_nested_batch(self):
+        with self.client.batch():
+            self.client.send(at.FTRIM())
+            with self.client.batch():
+                self.client.send(at.FTRIM())
+            self.client.send(at.FTRIM())
+        self.assertEqual(
+            self.server.recv(1024),
+            b'AT*FTRIM=2\rAT*FTRIM=3\rAT*FTRIM=4\r')
+
+    def test_batch_is_split(self):
+        command = at.CONFIG('a:b', 'x' * 300)
+        with self.client.batch():
+            for _ in range(5):
+                self.client.send(command)
+        packets = [self.server.recv(2048), self.server.recv(2048)]
+        for packet in packets:
+            self.assertLessEqual(len(packet), self.client.max_packet_size)
+        self.assertEqual(b''.join(packets).count(b'AT*CONFIG='), 5)
+        self.assertEqual(packets[1].split(b',')[0], b'AT*CONFIG=5')
+
+    def test_other_threads_are_not_batched(self):
+        with self.client.batch():
+            thread = threading.Thread(
+                target=self.client.send, args=(at.FTRIM(),))
+            thread.start()
+            thread.join()
+            self.assertEqual(self.server.recv(1024), b'AT*FTRIM=2\r')
+            self.client.send(at.FTRIM())
+        self.assertEqual(self.server.recv(1024), b'AT*FTRIM=3\r')
+
+
+class AsyncATClientTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.settimeout(1)
+        self.client = AsyncATClient(
+            *self.server.getsockname(), watchdog_interval=0.05)
+        self.client.connect()
+
+    async def asyncTearDown(self):
+        self.client.close()
+        self.server.close()
+
+    async def recv(self):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.server.recv, 1024)
+
+    async def test_watchdog(self):
+        self.assertEqual(await self.recv(), b'AT*COMWDG=1\r')
+        self.assertEqual(await self.recv(), b'AT*COMWDG=2\r')
+
+    async def test_send(self):
+        await asyncio.sleep(0)
+        self.client.send(at.REF_0_5(20))
+        self.assertEqual(await self.recv(), b'AT*COMWDG=1\r')
+        self.assertEqual(await self.recv(), b'AT*REF=2,20\r')
+
+    async def test_batch(self):
+        await asyncio.sleep(0)
+        with self.client.batch():
+            self.client.send(at.FTRIM())
+            self.client.send(at.FTRIM())
+        self.assertEqual(await self.recv(), b'AT*COMWDG=1\r')
+        self.assertEqual(await self.recv(), b'AT*FTRIM=2\rAT*FTRIM=3\r')
+
+    async def test_other_tasks_are_not_batched(self):
+        await asyncio.sleep(0)
+        sent = asyncio.Event()
+
+        async def send():
+            self.client.send(at.FTRIM())
+            sent.set()
+
+        with self.client.batch():
+            self.client.send(at.REF_0_5(20))
+            await asyncio.create_task(send())
+            self.assertEqual(await self.recv(), b'AT*COMWDG=1\r')
+            self.assertEqual(await self.recv(), b'AT*FTRIM=2\r')
+        self.assertEqual(await self.recv(), b'AT*REF=3,20\r')
+
+    async def test_close_stops_watchdog(self):
+        await asyncio.sleep(0)
+        self.client.close()
+        await asyncio.sleep(0.1)
+        self.assertEqual(await self.recv(), b'AT*COMWDG=1\r')
+        self.server.settimeout(0)
+        with self.assertRaises(BlockingIOError):
+            self.server.recv(1024)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+import time
+import unittest
+
+from pyardrone import at
+from pyardrone.control import PCMDScheduler
+
+
+class FakeClock:
+
+    '''
+    A clock which only advances when slept on or worked with.
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    work = sleep
+
+
+class RecordingDrone:
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.sent = []
+
+    def send(self, command):
+        self.sent.append((self.clock(), command))
+
+
+class PCMDSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.drone = RecordingDrone()
+
+    def test_sends_setpoint(self):
+        with PCMDScheduler(
+                self.drone, rate=100, hover_on_stop=False) as scheduler:
+            scheduler.move(forward=0.5, up=0.2)
+            time.sleep(0.05)
+        self.assertEqual(
+            self.drone.sent[-1][1],
+            at.PCMD(at.PCMD.flag.progressive, pitch=-0.5, gaz=0.2))
+
+    def test_hovers_on_stop(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with PCMDScheduler(self.drone, rate=100) as scheduler:
+                scheduler.move(forward=0.5)
+                time.sleep(0.05)
+                raise KeyboardInterrupt
+        self.assertEqual(
+            self.drone.sent[-2][1],
+            at.PCMD(at.PCMD.flag.progressive, pitch=-0.5))
+        self.assertEqual(self.drone.sent[-1][1], at.PCMD(flag=0))
+        self.assertEqual(scheduler.setpoint, at.PCMD(flag=0))
+
+    def test_unchanged_setpoint_is_deduplicated(self):
+        with PCMDScheduler(self.drone, rate=100, keepalive=10) as scheduler:
+            time.sleep(0.1)
+        # and the hover setpoint sent on stop
+        self.assertEqual(len(self.drone.sent), 2)
+        self.assertEqual(self.drone.sent[0][1], at.PCMD(flag=0))
+        self.assertEqual(scheduler.stats.sent, 1)
+        self.assertEqual(
+            scheduler.stats.deduplicated, scheduler.stats.ticks - 1)
+
+    def test_keepalive_zero_sends_every_tick(self):
+        with PCMDScheduler(self.drone, rate=100, keepalive=0) as scheduler:
+            time.sleep(0.1)
+        self.assertEqual(len(self.drone.sent), scheduler.stats.ticks + 1)
+        self.assertEqual(scheduler.stats.deduplicated, 0)
+
+    # exact in binary, so that the fake clock does not accumulate errors
+    period = 1 / 64
+
+    def run_for(self, periods, clock, drone):
+        end = clock() + periods * self.period
+
+        def sleep(seconds):
+            clock.sleep(seconds)
+            return clock() >= end
+
+        scheduler = PCMDScheduler(
+            drone, rate=1 / self.period, keepalive=0, hover_on_stop=False,
+            clock=clock, sleep=sleep)
+        scheduler.start()
+        scheduler._thread.join(1)
+        scheduler.stop()
+        return scheduler
+
+    def test_fixed_rate(self):
+        period = self.period
+
+        class SlowDrone(RecordingDrone):
+            def send(self, command):
+                super().send(command)
+                self.clock.work(period / 4)
+
+        clock = FakeClock()
+        drone = SlowDrone(clock)
+        scheduler = self.run_for(50, clock, drone)
+        self.assertEqual(scheduler.stats.ticks, 50)
+        self.assertEqual(scheduler.stats.missed, 0)
+        times = [sent_time for sent_time, _ in drone.sent]
+        self.assertEqual(
+            [b - a for a, b in zip(times, times[1:])], [period] * 49)
+        self.assertEqual(scheduler.stats.max_lateness, 0)
+
+    def test_missed_ticks(self):
+        period = self.period
+
+        class SlowDrone(RecordingDrone):
+            def send(self, command):
+                super().send(command)
+                self.clock.work(period * 3.5)
+
+        clock = FakeClock()
+        scheduler = self.run_for(20, clock, SlowDrone(clock))
+        # ticks run at 0, 3.5, 7, 10.5, 14 and 17.5 periods; the other
+        # deadlines up to 20 periods are skipped
+        self.assertEqual(scheduler.stats.ticks, 6)
+        self.assertEqual(scheduler.stats.ticks + scheduler.stats.missed, 21)
+        self.assertEqual(scheduler.stats.max_lateness, period / 2)
@@ -0,0 +1,108 @@
+import socket
+import unittest
+from ctypes import sizeof
+
+from pyardrone import at, navdata
+from pyardrone.fleet import Fleet
+from pyardrone.navdata import options
+
+
+def make_packet(sequence_number, state):
+    buffer = bytes(options.Metadata(
+        header=navdata.header,
+        state=state,
+        sequence_number=sequence_number,
+    ))
+    cks = options.Cks(
+        tag=0xffff,
+        size=sizeof(options.Cks),
+        value=navdata.compute_checksum(buffer),
+    )
+    return buffer + bytes(cks)
+
+
+class FakeDrone:
+
+    def __init__(self):
+        self.at_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.navdata_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for sock in (self.at_sock, self.navdata_sock):
+            sock.bind(('127.0.0.1', 0))
+            sock.settimeout(1)
+
+    @property
+    def kwargs(self):
+        return dict(
+            host='127.0.0.1',
+            at_port=self.at_sock.getsockname()[1],
+            navdata_port=self.navdata_sock.getsockname()[1],
+        )
+
+    def send_state(self, state):
+        hello, addr = self.navdata_sock.recvfrom(16)
+        self.navdata_sock.sendto(make_packet(1, state), addr)
+
+    def recv_commands(self):
+        while True:
+            command = self.at_sock.recv(1024)
+            if not command.startswith(b'AT*COMWDG'):
+                return command
+
+    def close(self):
+        self.at_sock.close()
+        self.navdata_sock.close()
+
+
+class FleetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fakes = [FakeDrone() for _ in range(3)]
+        self.fleet = Fleet()
+        self.drones = [self.fleet.add(**fake.kwargs) for fake in self.fakes]
+
+    def tearDown(self):
+        self.fleet.close()
+        for fake in self.fakes:
+            fake.close()
+
+    def test_navdata(self):
+        for state, fake in enumerate(self.fakes):
+            fake.send_state(state)
+        for state, drone in enumerate(self.drones):
+            self.assertTrue(drone.navdata_ready.wait(1))
+            self.assertEqual(drone.navdata.metadata.state, state)
+            self.assertEqual(drone.state.fly_mask, bool(state & 1))
+
+    def test_wait_for(self):
+        for state, fake in enumerate(self.fakes):
+            fake.send_state(state)
+        navdata = self.drones[1].wait_for(
+            lambda navdata: navdata.metadata.state == 1, timeout=1)
+        self.assertEqual(navdata.metadata.state, 1)
+        self.assertIsNone(self.drones[0].wait_next(timeout=0.01))
+
+    def test_unsupported_arguments(self):
+        with self.assertRaises(TypeError):
+            self.fleet.add(connect=False, drain=True)
+
+    def test_send(self):
+        for drone in self.drones:
+            drone.send(at.FTRIM())
+        for fake in self.fakes:
+            self.assertRegex(fake.recv_commands(), br'^AT\*FTRIM=\d+\r$')
+
+    def test_batch(self):
+        for drone in self.drones:
+            with drone.batch():
+                drone.send(at.FTRIM())
+                drone.send(at.FTRIM())
+        for fake in self.fakes:
+            self.assertRegex(
+                fake.recv_commands(),
+                br'^AT\*FTRIM=(\d+)\rAT\*FTRIM=\d+\r$')
+
+    def test_close(self):
+        self.fleet.close()
+        for drone in self.drones:
+            self.assertTrue(drone.closed)
+        self.assertTrue(self.fleet.loop.is_closed())
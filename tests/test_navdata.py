@@ -1,7 +1,21 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
 import unittest
 from ctypes import sizeof
 
+from pyardrone import navdata
 from pyardrone.navdata import options
+from pyardrone.navdata.aio import AsyncNavDataClient
+from pyardrone.navdata.states import DroneState
+from pyardrone.utils.structure import NUMPY
+
+if NUMPY:
+    from pyardrone.navdata.recorder import NavDataRecorder
+    from pyardrone.navdata.states import decode_states
 
 
 class NavDataSizeTest(unittest.TestCase):
@@ -82,3 +96,670 @@ class NavDataSizeTest(unittest.TestCase):
         self.assertOptionSize('navdata_games_t', 12)
         self.assertOptionSize('navdata_wifi_t', 8)
         self.assertOptionSize('navdata_cks_t', 8)
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_dtype_size(self):
+        for option_class in options.index.values():
+            with self.subTest(option_class=option_class):
+                self.assertEqual(
+                    option_class.dtype.itemsize, sizeof(option_class))
+
+
+def make_packet(*contents, sequence_number=1, state=0):
+    '''
+    Builds a navdata packet out of the given options, the checksum option is
+    appended automatically.
+    '''
+    buffer = bytearray(options.Metadata(
+        header=navdata.header,
+        state=state,
+        sequence_number=sequence_number,
+    ))
+    for option in contents:
+        option.tag = next(
+            tag for tag, cls in options.index.items()
+            if cls is type(option)
+        )
+        option.size = sizeof(option)
+        buffer += bytes(option)
+    cks = options.Cks(tag=0xffff, size=sizeof(options.Cks))
+    cks.value = navdata.compute_checksum(buffer)
+    return bytes(buffer + bytes(cks))
+
+
+class DroneStateTest(unittest.TestCase):
+
+    def test_masks(self):
+        state = DroneState(0b101 | 1 << 31)
+        self.assertTrue(state.fly_mask)
+        self.assertFalse(state.video_mask)
+        self.assertTrue(state.vision_mask)
+        self.assertTrue(state.emergency_mask)
+        self.assertEqual(len(DroneState.masks), 32)
+
+    def test_as_dict(self):
+        state = DroneState(0b101 | 1 << 31)
+        flags = state.as_dict()
+        self.assertEqual(
+            flags, {name: getattr(state, name) for name, _ in state.masks})
+        self.assertEqual(sum(flags.values()), 3)
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_decode_states(self):
+        words = [0, 1, 0b110, 1 << 31]
+        columns = decode_states(words)
+        self.assertEqual(
+            columns['fly_mask'].tolist(), [False, True, False, False])
+        self.assertEqual(
+            columns['emergency_mask'].tolist(), [False, False, False, True])
+        for i, word in enumerate(words):
+            self.assertEqual(
+                {name: column[i] for name, column in columns.items()},
+                DroneState(word).as_dict())
+
+
+class SubscribeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = navdata.NavDataHandler()
+        self.handler.lazy = True
+        self.packet = make_packet(
+            options.Demo(altitude=1200),
+            options.Wifi(link_quality=3),
+        )
+
+    def test_callback(self):
+        received = []
+        self.handler.subscribe(options.Demo, received.append)
+        self.handler.subscribe(options.Magneto, received.append)
+        self.handler.navdata_received(self.packet)
+        self.assertEqual(len(received), 1)
+        self.assertEqual(received[0].altitude, 1200)
+
+    def test_only_subscribed_options_are_decoded(self):
+        self.handler.subscribe(options.Demo, lambda option: None)
+        self.handler.navdata_received(self.packet)
+        self.assertNotIn('demo', self.handler.navdata._offsets)
+        self.assertIn('wifi', self.handler.navdata._offsets)
+
+    def test_subscribing_decodes_lazily(self):
+        self.handler.lazy = False
+        self.handler.navdata_received(self.packet)
+        self.assertIs(type(self.handler.navdata), navdata.NavData)
+        self.handler.subscribe(options.Demo, lambda option: None)
+        self.handler.navdata_received(self.packet)
+        self.assertIn('wifi', self.handler.navdata._offsets)
+        self.assertEqual(self.handler.navdata.wifi.link_quality, 3)
+
+    def test_subscribe_by_tag(self):
+        received = []
+        self.handler.subscribe(26, received.append)
+        self.handler.navdata_received(self.packet)
+        self.assertEqual(received[0].link_quality, 3)
+
+    def test_unsubscribe(self):
+        received = []
+        self.handler.subscribe(options.Demo, received.append)
+        self.handler.unsubscribe(options.Demo, received.append)
+        self.handler.navdata_received(self.packet)
+        self.assertEqual(received, [])
+        with self.assertRaises(ValueError):
+            self.handler.unsubscribe(options.Demo, received.append)
+
+    def test_failing_callback(self):
+        received = []
+
+        def fail(option):
+            raise RuntimeError
+
+        self.handler.subscribe(options.Demo, fail)
+        self.handler.subscribe(options.Demo, received.append)
+        with self.assertLogs('pyardrone.navdata', 'ERROR') as logs:
+            self.handler.navdata_received(self.packet)
+        self.assertEqual(len(received), 1)
+        self.assertIs(logs.records[0].exc_info[0], RuntimeError)
+
+
+class ChecksumTest(unittest.TestCase):
+
+    sizes = (0, 1, 7, 200, 511, 512, 513, 1000, 4095, 4096, 5000)
+
+    def assertChecksum(self, function):
+        for size in self.sizes:
+            with self.subTest(size=size):
+                buffer = memoryview(os.urandom(size))
+                self.assertEqual(function(buffer), sum(buffer))
+
+    def test_compute_checksum(self):
+        self.assertChecksum(navdata.compute_checksum)
+
+    def test_int_checksum(self):
+        self.sizes = [size for size in self.sizes if size <= 4096]
+        self.assertChecksum(navdata._compute_checksum_int)
+
+    def test_int_checksum_max_value(self):
+        self.assertEqual(
+            navdata._compute_checksum_int(b'\xff' * 4096), 255 * 4096)
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_numpy_checksum(self):
+        self.assertChecksum(navdata._compute_checksum_numpy)
+
+
+class NavDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.packet = make_packet(
+            options.Demo(altitude=1200, vx=0.5),
+            options.Wifi(link_quality=3),
+        )
+
+    def test_parse(self):
+        nav = navdata.NavData(self.packet)
+        self.assertEqual(nav.metadata.header, navdata.header)
+        self.assertEqual(nav.demo.altitude, 1200)
+        self.assertEqual(nav.demo.vx, 0.5)
+        self.assertEqual(nav.wifi.link_quality, 3)
+
+    def test_peek_sequence_number(self):
+        packet = make_packet(sequence_number=123456)
+        self.assertEqual(navdata.peek_sequence_number(packet), 123456)
+
+    def test_slots(self):
+        nav = navdata.NavData(self.packet)
+        self.assertEqual(vars(nav), {})
+        self.assertFalse(hasattr(nav, 'magneto'))
+        self.assertEqual(
+            list(nav.as_dict()),
+            ['checksum', 'metadata', 'demo', 'wifi', 'cks'])
+        self.assertRegex(repr(nav), r'^NavData\(checksum=\d+, metadata=')
+
+    def test_incorrect_checksum(self):
+        packet = bytearray(self.packet)
+        packet[20] ^= 0xff
+        with self.assertRaises(navdata.IncorrectChecksum):
+            navdata.NavData(packet)
+
+    def test_checksum_not_present(self):
+        with self.assertRaises(navdata.ChecksumNotPresent):
+            navdata.NavData(self.packet[:-8])
+
+    def test_skip_checksum_verification(self):
+        packet = bytearray(self.packet)
+        packet[20] ^= 0xff
+        nav = navdata.NavData(packet, verify_checksum=False)
+        self.assertIsNone(nav.checksum)
+        navdata.NavData(self.packet[:-8], verify_checksum=False)
+
+
+class ZeroCopyNavDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.buffer = bytearray(make_packet(
+            options.Demo(altitude=1200),
+        ))
+        self.nav = navdata.NavData(self.buffer, copy=False)
+
+    def test_parse(self):
+        self.assertEqual(self.nav.demo.altitude, 1200)
+
+    def test_options_are_views(self):
+        self.buffer[:] = make_packet(options.Demo(altitude=300))
+        self.assertEqual(self.nav.demo.altitude, 300)
+
+    def test_snapshot_is_a_copy(self):
+        snapshot = self.nav.snapshot()
+        self.buffer[:] = make_packet(options.Demo(altitude=300))
+        self.assertEqual(snapshot.demo.altitude, 1200)
+        self.assertEqual(snapshot.checksum, self.nav.checksum)
+
+    def test_read_only_buffer(self):
+        with self.assertRaises(TypeError):
+            navdata.NavData(bytes(self.buffer), copy=False)
+
+
+class LazyNavDataTest(unittest.TestCase):
+
+    def setUp(self):
+        self.nav = navdata.LazyNavData(make_packet(
+            options.Demo(altitude=1200),
+            options.Wifi(link_quality=3),
+        ))
+
+    def test_options_are_not_created_on_init(self):
+        self.assertIn('demo', self.nav._offsets)
+        self.assertIn('wifi', self.nav._offsets)
+
+    def test_option_is_created_on_access(self):
+        self.assertEqual(self.nav.demo.altitude, 1200)
+        self.assertNotIn('demo', self.nav._offsets)
+        self.assertIn('wifi', self.nav._offsets)
+
+    def test_as_dict_creates_all_options(self):
+        self.assertEqual(
+            set(self.nav.as_dict()),
+            {'checksum', 'metadata', 'demo', 'wifi', 'cks'})
+        self.assertEqual(self.nav._offsets, {})
+
+    def test_missing_option(self):
+        self.assertFalse(hasattr(self.nav, 'magneto'))
+
+    def test_checksum_is_verified(self):
+        packet = bytearray(make_packet(options.Demo(altitude=1200)))
+        packet[20] ^= 0xff
+        with self.assertRaises(navdata.IncorrectChecksum):
+            navdata.LazyNavData(packet)
+
+    def test_snapshot(self):
+        snapshot = self.nav.snapshot()
+        self.assertEqual(snapshot.demo.altitude, 1200)
+        self.assertEqual(snapshot.wifi.link_quality, 3)
+
+
+@unittest.skipUnless(NUMPY, 'requires numpy')
+class NavDataRecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.recorder = NavDataRecorder(
+            ['demo.altitude', 'demo.drone_camera_rot', 'wifi'], capacity=4)
+
+    def record(self, altitude, timestamp):
+        demo = options.Demo(altitude=altitude)
+        demo.drone_camera_rot[1][1] = altitude
+        nav = navdata.NavData(make_packet(
+            demo, options.Wifi(link_quality=altitude * 2)))
+        return self.recorder.record(nav, timestamp=timestamp)
+
+    def test_empty(self):
+        self.assertEqual(len(self.recorder), 0)
+        self.assertEqual(self.recorder['demo.altitude'].tolist(), [])
+
+    def test_columns(self):
+        self.assertEqual(
+            self.recorder.columns,
+            ['timestamp', 'demo.altitude', 'demo.drone_camera_rot', 'wifi'])
+
+    def test_record(self):
+        for i in range(3):
+            self.assertTrue(self.record(i, timestamp=i))
+        self.assertEqual(len(self.recorder), 3)
+        self.assertEqual(self.recorder['timestamp'].tolist(), [0, 1, 2])
+        self.assertEqual(self.recorder['demo.altitude'].tolist(), [0, 1, 2])
+        self.assertEqual(
+            self.recorder['demo.drone_camera_rot'][:, 1, 1].tolist(),
+            [0, 1, 2])
+        self.assertEqual(
+            self.recorder['wifi']['link_quality'].tolist(), [0, 2, 4])
+
+    def test_wrap_around(self):
+        for i in range(10):
+            self.record(i, timestamp=i)
+        self.assertEqual(len(self.recorder), 4)
+        self.assertEqual(
+            self.recorder['demo.altitude'].tolist(), [6, 7, 8, 9])
+
+    def test_queries_are_views(self):
+        for i in range(10):
+            self.record(i, timestamp=i)
+        self.assertFalse(self.recorder['demo.altitude'].flags.owndata)
+
+    def test_since(self):
+        for i in range(10):
+            self.record(i, timestamp=i)
+        window = self.recorder.since(7.5)
+        self.assertEqual(window['demo.altitude'].tolist(), [8, 9])
+        self.assertEqual(window['timestamp'].tolist(), [8, 9])
+
+    def test_missing_option_is_not_recorded(self):
+        nav = navdata.NavData(make_packet(options.Demo(altitude=3)))
+        self.assertFalse(self.recorder.record(nav))
+        self.assertEqual(len(self.recorder), 0)
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            NavDataRecorder(['demo.nothing'], capacity=4)
+        with self.assertRaises(ValueError):
+            NavDataRecorder(['nothing'], capacity=4)
+
+    def test_file_backed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'navdata.bin')
+            recorder = NavDataRecorder(['demo.altitude'], 8, path=path)
+            packet = make_packet(options.Demo(altitude=5))
+            recorder.record(navdata.NavData(packet))
+            recorder.flush()
+            self.assertGreater(os.path.getsize(path), 0)
+            self.assertEqual(recorder['demo.altitude'].tolist(), [5])
+
+
+class FakeDrone:
+
+    '''
+    A UDP socket sending navdata packets to the client which said hello.
+    '''
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(1)
+        self.host, self.port = self.sock.getsockname()
+        self.client_addr = None
+
+    def accept(self):
+        hello, self.client_addr = self.sock.recvfrom(16)
+        assert hello == b'\x01\x00\x00\x00', hello
+
+    def send(self, *contents, **kwargs):
+        self.sock.sendto(make_packet(*contents, **kwargs), self.client_addr)
+
+    def close(self):
+        self.sock.close()
+
+
+class SequenceTrackerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tracker = navdata.SequenceTracker()
+
+    def accept(self, *sequence_numbers):
+        return [self.tracker.accept(n) for n in sequence_numbers]
+
+    def test_in_order(self):
+        self.assertEqual(self.accept(1, 2, 3), [True, True, True])
+        self.assertEqual(self.tracker.last, 3)
+        self.assertEqual(self.tracker.lost, 0)
+
+    def test_duplicate(self):
+        self.assertEqual(self.accept(1, 1), [True, False])
+        self.assertEqual(self.tracker.duplicates, 1)
+
+    def test_lost_and_reordered(self):
+        self.assertEqual(self.accept(1, 4, 3, 5), [True, True, False, True])
+        self.assertEqual(self.tracker.reordered, 1)
+        self.assertEqual(self.tracker.lost, 1)
+        self.assertEqual(self.tracker.last, 5)
+
+    def test_reset(self):
+        self.assertEqual(self.accept(5000, 10, 11), [True, True, True])
+        self.assertEqual(self.tracker.resets, 1)
+
+    def test_restart_at_one(self):
+        self.accept(*range(1, 301))
+        self.assertEqual(self.accept(*range(1, 301)), [True] * 300)
+        self.assertEqual(self.tracker.resets, 1)
+        self.assertEqual(self.tracker.reordered, 0)
+
+    def test_restarted(self):
+        self.accept(500)
+        self.assertTrue(self.tracker.accept(3, restarted=True))
+        self.assertEqual(self.tracker.resets, 1)
+        self.assertEqual(self.accept(4), [True])
+
+
+class SlowNavDataClient(navdata.NavDataClient):
+
+    '''
+    A client busy parsing its first packet, so that the following packets
+    queue up in the socket.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.parsed = 0
+
+    def navdata_received(self, data):
+        self.parsed += 1
+        if self.parsed == 1:
+            time.sleep(0.05)
+        super().navdata_received(data)
+
+
+class SequenceRecorder:
+
+    def __init__(self):
+        self.sequence_numbers = []
+
+    def record(self, navdata):
+        self.sequence_numbers.append(navdata.metadata.sequence_number)
+
+
+class NavDataClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.drone = FakeDrone()
+        self.client = None
+
+    def tearDown(self):
+        self.client.close()
+        self.drone.close()
+
+    def connect(self, client_class=navdata.NavDataClient, **kwargs):
+        self.client = client_class(self.drone.host, self.drone.port, **kwargs)
+        self.client.connect()
+        self.drone.accept()
+
+    def send_sequence(self, count):
+        for sequence_number in range(1, count + 1):
+            self.drone.send(sequence_number=sequence_number)
+        time.sleep(0.1)
+
+    def test_receive(self):
+        self.connect()
+        self.drone.send(options.Demo(altitude=42))
+        self.assertTrue(self.client.navdata_ready.wait(1))
+        self.assertEqual(self.client.navdata.demo.altitude, 42)
+
+    def test_zero_copy(self):
+        self.connect(zero_copy=True)
+        self.send_sequence(3)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 3)
+
+    def test_drain_parses_newest(self):
+        self.connect(SlowNavDataClient, drain=True)
+        self.send_sequence(10)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 10)
+        self.assertLessEqual(self.client.parsed, 2)
+
+    def test_drain_zero_copy(self):
+        self.connect(SlowNavDataClient, drain=True, zero_copy=True)
+        self.send_sequence(10)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 10)
+        self.assertLessEqual(self.client.parsed, 2)
+
+    def test_drain_records_all(self):
+        self.connect(SlowNavDataClient, drain=True)
+        self.client.recorder = recorder = SequenceRecorder()
+        self.send_sequence(10)
+        self.assertEqual(recorder.sequence_numbers, list(range(1, 11)))
+        self.assertEqual(self.client.packets_skipped, 0)
+
+    def test_latest_only(self):
+        self.connect(SlowNavDataClient, latest_only=True)
+        self.client.recorder = recorder = SequenceRecorder()
+        for sequence_number in (1, 2, 5, 3, 4):
+            self.drone.send(sequence_number=sequence_number)
+        time.sleep(0.1)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 5)
+        self.assertEqual(self.client.packets_received, 5)
+        self.assertEqual(
+            self.client.packets_skipped, 5 - len(recorder.sequence_numbers))
+        self.assertLessEqual(len(recorder.sequence_numbers), 2)
+
+    def drain_across_restart(self, **kwargs):
+        self.connect(SlowNavDataClient, **kwargs)
+        self.drone.send(sequence_number=500)
+        time.sleep(0.01)
+        # queued while the first packet is parsed
+        self.drone.send(sequence_number=501)
+        self.drone.send(
+            sequence_number=1, state=DroneState.com_watchdog_mask.mask)
+        self.drone.send(sequence_number=2)
+        time.sleep(0.1)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 2)
+        self.drone.send(sequence_number=3)
+        time.sleep(0.05)
+        self.assertEqual(self.client.navdata.metadata.sequence_number, 3)
+        self.assertEqual(self.client.sequence.resets, 1)
+        self.assertEqual(self.client.sequence.reordered, 0)
+
+    def test_drain_across_restart(self):
+        self.drain_across_restart(drain=True)
+
+    def test_latest_only_across_restart(self):
+        self.drain_across_restart(latest_only=True)
+
+    def test_stale_packets_are_discarded(self):
+        self.connect()
+        for sequence_number in (1, 3, 2, 3):
+            self.drone.send(
+                options.Demo(altitude=sequence_number),
+                sequence_number=sequence_number)
+            time.sleep(0.01)
+        self.assertEqual(self.client.navdata.demo.altitude, 3)
+        self.assertEqual(self.client.sequence.reordered, 1)
+        self.assertEqual(self.client.sequence.duplicates, 1)
+
+    def test_invalid_packet_is_dropped(self):
+        self.connect()
+        packet = bytearray(make_packet(sequence_number=1))
+        packet[-1] ^= 0xff
+        with self.assertLogs('pyardrone.navdata', 'WARNING'):
+            self.drone.sock.sendto(packet, self.drone.client_addr)
+            time.sleep(0.05)
+        self.assertFalse(self.client.navdata_ready.is_set())
+        # the listener is still running
+        self.drone.send(sequence_number=2)
+        self.assertTrue(self.client.navdata_ready.wait(1))
+
+    def test_com_watchdog_restarts_sequence(self):
+        self.connect()
+        self.drone.send(options.Demo(altitude=1), sequence_number=500)
+        time.sleep(0.01)
+        self.drone.send(
+            options.Demo(altitude=2), sequence_number=3,
+            state=DroneState.com_watchdog_mask.mask)
+        time.sleep(0.05)
+        self.assertEqual(self.client.navdata.demo.altitude, 2)
+        self.assertEqual(self.client.sequence.resets, 1)
+
+    def test_without_sequence_tracking(self):
+        self.connect(track_sequence=False)
+        for sequence_number in (3, 2):
+            self.drone.send(
+                options.Demo(altitude=sequence_number),
+                sequence_number=sequence_number)
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertIsNone(self.client.sequence)
+        self.assertEqual(self.client.navdata.demo.altitude, 2)
+
+    def test_wait_next(self):
+        self.connect()
+        threading.Timer(0.01, self.drone.send, kwargs=dict(
+            sequence_number=1)).start()
+        self.assertEqual(
+            self.client.wait_next(1).metadata.sequence_number, 1)
+        self.assertIsNone(self.client.wait_next(0.01))
+
+    def test_wait_for(self):
+        self.connect()
+        thread = threading.Thread(target=self.send_sequence, args=(5,))
+        thread.start()
+        navdata = self.client.wait_for(
+            lambda navdata: navdata.metadata.sequence_number >= 3, 1)
+        thread.join()
+        self.assertGreaterEqual(navdata.metadata.sequence_number, 3)
+        # satisfied by the current navdata
+        self.assertIs(
+            self.client.wait_for(lambda navdata: True, 0), self.client.navdata)
+
+    def test_wait_raises_on_close(self):
+        self.connect()
+        threading.Timer(0.01, self.client.close).start()
+        with self.assertRaises(RuntimeError):
+            self.client.wait_next()
+
+    def test_close_is_immediate(self):
+        self.connect()
+        start = time.monotonic()
+        self.client.close()
+        self.assertLess(time.monotonic() - start, 0.005)
+        self.assertFalse(self.client._thread.is_alive())
+
+
+class AsyncNavDataClientTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.drone = FakeDrone()
+        self.client = AsyncNavDataClient(self.drone.host, self.drone.port)
+        self.client.connect()
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.drone.accept)
+
+    async def asyncTearDown(self):
+        self.client.close()
+        self.drone.close()
+
+    async def test_next_navdata(self):
+        waiter = asyncio.ensure_future(self.client.next_navdata())
+        await asyncio.sleep(0)
+        self.drone.send(options.Demo(altitude=42))
+        nav = await asyncio.wait_for(waiter, 1)
+        self.assertEqual(nav.demo.altitude, 42)
+        self.assertTrue(self.client.navdata_ready.is_set())
+        self.assertIs(self.client.navdata, nav)
+
+    async def test_iterate(self):
+        async def collect():
+            result = []
+            async for nav in self.client:
+                result.append(nav.metadata.sequence_number)
+                if len(result) == 3:
+                    break
+            return result
+
+        task = asyncio.ensure_future(collect())
+        for sequence_number in range(1, 4):
+            await asyncio.sleep(0.01)
+            self.drone.send(sequence_number=sequence_number)
+        self.assertEqual(await asyncio.wait_for(task, 1), [1, 2, 3])
+
+    async def test_iteration_stops_on_close(self):
+        async def consume():
+            async for nav in self.client:
+                pass
+
+        task = asyncio.ensure_future(consume())
+        await asyncio.sleep(0)
+        self.client.close()
+        await asyncio.wait_for(task, 1)
+
+    async def test_wait_for(self):
+        async def send():
+            for sequence_number in range(1, 6):
+                await asyncio.sleep(0.01)
+                self.drone.send(sequence_number=sequence_number)
+
+        task = asyncio.ensure_future(send())
+        navdata = await self.client.wait_for(
+            lambda navdata: navdata.metadata.sequence_number >= 3, 1)
+        self.assertEqual(navdata.metadata.sequence_number, 3)
+        await task
+        self.assertIsNone(await self.client.wait_next(0.01))
+
+    async def test_stale_packet_is_discarded(self):
+        waiter = asyncio.ensure_future(self.client.next_navdata())
+        await asyncio.sleep(0)
+        self.drone.send(sequence_number=3)
+        nav = await asyncio.wait_for(waiter, 1)
+        self.drone.send(sequence_number=2)
+        await asyncio.sleep(0.05)
+        self.assertIs(self.client.navdata, nav)
+        self.assertEqual(self.client.sequence.reordered, 1)
+
+    async def test_invalid_packet_is_dropped(self):
+        packet = bytearray(make_packet())
+        packet[-1] ^= 0xff
+        self.drone.sock.sendto(packet, self.drone.client_addr)
+        await asyncio.sleep(0.05)
+        self.assertFalse(self.client.navdata_ready.is_set())
@@ -0,0 +1,86 @@
+import unittest
+from ctypes import sizeof
+
+from pyardrone import pave
+from pyardrone.pave import PaVE, PaVEParser
+
+
+def make_frame(frame_number, payload, frame_type=pave.FRAME_TYPE_P_FRAME,
+               header_size=sizeof(PaVE)):
+    header = PaVE(
+        signature=(PaVE.HEADER[0], PaVE.HEADER[1],
+                   PaVE.HEADER[2], PaVE.HEADER[3]),
+        header_size=header_size,
+        payload_size=len(payload),
+        frame_number=frame_number,
+        frame_type=frame_type,
+        timestamp=frame_number * 33,
+    )
+    padding = bytes(header_size - sizeof(PaVE))
+    return bytes(header) + padding + payload
+
+
+class PaVETest(unittest.TestCase):
+
+    def test_size(self):
+        self.assertEqual(sizeof(PaVE), 64)
+
+    def test_unsigned(self):
+        header = PaVE(frame_number=0xffffffff, payload_size=0x80000000)
+        self.assertEqual(header.frame_number, 0xffffffff)
+        self.assertEqual(header.payload_size, 0x80000000)
+
+
+class PaVEParserTest(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = PaVEParser()
+        self.stream = b''.join([
+            make_frame(1, b'idr' * 100, pave.FRAME_TYPE_IDR_FRAME),
+            make_frame(2, b'p' * 7),
+            make_frame(3, b'PaVE inside the payload'),
+        ])
+
+    def check(self, frames):
+        self.assertEqual([frame.frame_number for frame in frames], [1, 2, 3])
+        self.assertEqual(frames[0].payload, b'idr' * 100)
+        self.assertEqual(frames[1].payload, b'p' * 7)
+        self.assertEqual(frames[2].payload, b'PaVE inside the payload')
+        self.assertEqual(frames[1].timestamp, 66)
+        self.assertEqual(
+            [frame.keyframe for frame in frames], [True, False, False])
+        self.assertEqual(len(self.parser), 0)
+
+    def test_whole_stream(self):
+        self.check(self.parser.feed(self.stream))
+
+    def test_every_split(self):
+        for split in range(len(self.stream)):
+            with self.subTest(split=split):
+                self.parser = PaVEParser()
+                frames = self.parser.feed(self.stream[:split])
+                frames += self.parser.feed(self.stream[split:])
+                self.check(frames)
+                self.assertEqual(self.parser.discarded, 0)
+
+    def test_byte_by_byte(self):
+        frames = []
+        for i in range(len(self.stream)):
+            frames += self.parser.feed(self.stream[i:i + 1])
+        self.check(frames)
+
+    def test_larger_header(self):
+        frames = self.parser.feed(make_frame(1, b'data', header_size=68))
+        self.assertEqual(frames[0].payload, b'data')
+
+    def test_resync(self):
+        frames = self.parser.feed(b'garbage' + self.stream)
+        self.check(frames)
+        self.assertEqual(self.parser.discarded, 7)
+
+    def test_corrupt_header(self):
+        corrupt = bytearray(make_frame(0, b''))
+        corrupt[PaVE.header_size.offset] = 16
+        frames = self.parser.feed(corrupt + self.stream)
+        self.check(frames)
+        self.assertEqual(self.parser.discarded, len(corrupt))
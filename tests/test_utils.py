@@ -1,5 +1,10 @@
+import errno
+import time
 import unittest
-from pyardrone.utils import repack_to_int, bits, noop
+from unittest import mock
+from pyardrone.utils import repack_to_int, bits, noop, every, timing
+from pyardrone.utils.timing import (
+    Histogram, Ticker, PRECISE_SLEEP, sleep_until)
 
 
 class IEEE754Test(unittest.TestCase):
@@ -29,3 +34,125 @@ class NoopTest(unittest.TestCase):
     def test_whatever(self):
         self.assertEqual(noop(3 + 4), 7)
         self.assertEqual(noop(1), True)
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_buckets(self):
+        histogram = Histogram(edges=(1, 2))
+        for value in (0.5, 1, 1.5, 3, 4):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [1, 2, 2])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.max, 4)
+        self.assertAlmostEqual(histogram.mean, 2)
+        self.assertAlmostEqual(histogram.std, 1.4577379737)
+
+
+class FakeClock:
+
+    '''
+    A clock which only advances when slept on or worked with.
+    '''
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    work = sleep
+
+
+class TickerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def ticker(self, period, **kwargs):
+        return Ticker(
+            period, clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_does_not_drift(self):
+        ticker = self.ticker(0.01)
+        start = self.clock()
+        for elapsed in ticker:
+            self.clock.work(0.002)
+            if ticker.ticks == 30:
+                break
+        self.assertAlmostEqual(elapsed, 0.29)
+        self.assertAlmostEqual(self.clock() - start, 0.292)
+        self.assertEqual(ticker.missed, 0)
+        self.assertEqual(ticker.lateness.count, 30)
+        self.assertAlmostEqual(ticker.lateness.max, 0)
+
+    def test_missed(self):
+        ticker = self.ticker(0.02)
+        for elapsed in ticker:
+            if ticker.ticks == 1:
+                self.clock.work(0.045)
+            elif ticker.ticks == 2:
+                break
+        # the tick due at 0.02 is skipped, 0.04 runs late
+        self.assertEqual(ticker.missed, 1)
+        self.assertAlmostEqual(elapsed, 0.045)
+        self.assertAlmostEqual(ticker.lateness.max, 0.005)
+
+    def test_catch_up(self):
+        ticker = self.ticker(0.01, skip_missed=False)
+        times = []
+        for elapsed in ticker:
+            times.append(elapsed)
+            if ticker.ticks == 1:
+                self.clock.work(0.035)
+            elif ticker.ticks == 6:
+                break
+        self.assertEqual(ticker.missed, 0)
+        expected = [0, 0.035, 0.035, 0.035, 0.04, 0.05]
+        for elapsed, expected_elapsed in zip(times, expected):
+            self.assertAlmostEqual(elapsed, expected_elapsed)
+        self.assertAlmostEqual(ticker.lateness.max, 0.025)
+
+    def test_sleep_stops(self):
+        ticker = Ticker(0.01, sleep=lambda seconds: ticker.ticks == 3)
+        self.assertEqual(len(list(ticker)), 3)
+
+
+class SleepUntilTest(unittest.TestCase):
+
+    def test_does_not_wake_early(self):
+        deadline = time.monotonic() + 0.01
+        sleep_until(deadline)
+        self.assertGreaterEqual(time.monotonic(), deadline)
+
+    @unittest.skipUnless(PRECISE_SLEEP, 'requires clock_nanosleep')
+    def test_precise(self):
+        deadline = time.monotonic() + 0.01
+        sleep_until(deadline, precise=True)
+        self.assertGreaterEqual(time.monotonic(), deadline)
+
+    def test_precise_retries_on_eintr(self):
+        results = [errno.EINTR, 0]
+        nanosleep = mock.Mock(side_effect=lambda *args: results.pop(0))
+        with mock.patch.object(timing, '_clock_nanosleep', nanosleep):
+            sleep_until(time.monotonic() + 1, precise=True)
+        self.assertEqual(nanosleep.call_count, 2)
+
+    def test_precise_falls_back_on_error(self):
+        nanosleep = mock.Mock(return_value=errno.EINVAL)
+        deadline = time.monotonic() + 0.01
+        with mock.patch.object(timing, '_clock_nanosleep', nanosleep):
+            sleep_until(deadline, precise=True)
+        self.assertEqual(nanosleep.call_count, 1)
+        self.assertGreaterEqual(time.monotonic(), deadline)
+
+
+class EveryTest(unittest.TestCase):
+
+    def test_yields_ticks(self):
+        with mock.patch.object(timing, 'Ticker', return_value=[0, 0.5, 1]):
+            self.assertEqual(list(every(0.5)), [0, 0.5, 1])
+            timing.Ticker.assert_called_once_with(0.5)
@@ -3,7 +3,10 @@ import unittest
 import ctypes
 from struct import calcsize
 
-from pyardrone.utils.structure import Structure
+from pyardrone.utils.structure import Structure, NUMPY
+
+if NUMPY:
+    import numpy
 
 
 class SubclassesTest(unittest.TestCase):
@@ -495,5 +498,63 @@ class TestRecursiveStructure(unittest.TestCase):
             self.fail("AttributeError not raised")
 
 
+@unittest.skipUnless(NUMPY, 'requires numpy')
+class DtypeTest(unittest.TestCase):
+
+    def test_simple(self):
+        class X(Structure):
+            a = ctypes.c_uint8
+            b = ctypes.c_int32
+
+        self.assertEqual(X.dtype.names, ('a', 'b'))
+        self.assertEqual(X.dtype.itemsize, ctypes.sizeof(X))
+        self.assertEqual(X.dtype.fields['b'][1], X.b.offset)
+
+    def test_packed(self):
+        class X(Structure):
+            _pack_ = 1
+            a = ctypes.c_uint8
+            b = ctypes.c_float
+
+        self.assertEqual(X.dtype.itemsize, 5)
+        self.assertEqual(X.dtype.fields['b'][1], 1)
+
+    def test_inherited_fields(self):
+        class X(Structure):
+            a = ctypes.c_int16
+
+        class Y(X):
+            b = ctypes.c_int16
+
+        self.assertEqual(Y.dtype.names, ('a', 'b'))
+
+    def test_nested_array(self):
+        class X(Structure):
+            m = ctypes.c_float * 3 * 2
+
+        self.assertEqual(X.dtype['m'].shape, (2, 3))
+
+    def test_nested_structure(self):
+        class X(Structure):
+            a = ctypes.c_int16
+
+        class Y(Structure):
+            x = X * 2
+
+        self.assertEqual(Y.dtype['x'].shape, (2,))
+        self.assertEqual(Y.dtype['x'].base.names, ('a',))
+
+    def test_frombuffer(self):
+        class X(Structure):
+            _pack_ = 1
+            a = ctypes.c_uint8
+            b = ctypes.c_int32 * 2
+
+        buffer = bytes(X(1, (2, 3))) + bytes(X(4, (5, 6)))
+        array = numpy.frombuffer(buffer, X.dtype)
+        self.assertEqual(array['a'].tolist(), [1, 4])
+        self.assertEqual(array['b'].tolist(), [[2, 3], [5, 6]])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,480 @@
+import contextlib
+import socket
+import threading
+import types
+import unittest
+from ctypes import sizeof
+from unittest import mock
+
+from pyardrone import pave, video
+from pyardrone.pave import PaVE
+from pyardrone.utils.structure import NUMPY
+from pyardrone.video import LatencyBoundedQueue, VideoClient
+
+if NUMPY:
+    from pyardrone.video import FramePool
+
+
+def make_header(frame_number, payload_size=0, **kwargs):
+    return PaVE(
+        signature=tuple(PaVE.HEADER),
+        header_size=sizeof(PaVE),
+        payload_size=payload_size,
+        frame_number=frame_number,
+        **kwargs
+    )
+
+
+def make_frame(frame_number, payload):
+    return bytes(make_header(frame_number, len(payload))) + payload
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.time = 1000.0
+
+    def __call__(self):
+        return self.time
+
+
+class FakeFFmpegError(Exception):
+    pass
+
+
+class FakePlane(bytes):
+
+    '''
+    A bgr24 plane whose rows are padded to *line_size* bytes.
+    '''
+
+    def __new__(cls, value, width, height, padding=2):
+        row = bytes([value]) * (width * 3) + b'\xff' * padding
+        plane = super().__new__(cls, row * height)
+        plane.line_size = len(row)
+        return plane
+
+
+class FakeVideoFrame:
+
+    '''
+    A decoded frame whose pixels are all *value*.
+    '''
+
+    width = 4
+    height = 2
+
+    def __init__(self, value, format='yuv420p'):
+        self.value = value
+        self.format = format
+        self.planes = [FakePlane(value, self.width, self.height)]
+
+    def to_ndarray(self, format):
+        return ('ndarray', format, self.value)
+
+    def reformat(self, format):
+        return FakeVideoFrame(self.value, format)
+
+
+class FakeCodecContext:
+
+    '''
+    Decodes each byte of a packet into a frame of that value, and fails on
+    empty packets.
+    '''
+
+    @classmethod
+    def create(cls, codec, mode):
+        return cls()
+
+    def decode(self, packet):
+        if not packet:
+            raise FakeFFmpegError('invalid data')
+        return [FakeVideoFrame(value) for value in packet]
+
+
+fake_av = types.SimpleNamespace(
+    CodecContext=FakeCodecContext,
+    Packet=bytes,
+    error=types.SimpleNamespace(FFmpegError=FakeFFmpegError),
+)
+
+
+class AVDecoderTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(video, 'av', fake_av, create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.decoder = video.AVDecoder()
+
+    def test_decode_bgr(self):
+        self.assertEqual(
+            list(self.decoder.decode(b'\x01\x02')),
+            [('ndarray', 'bgr24', 1), ('ndarray', 'bgr24', 2)])
+
+    def test_decode_error_is_dropped(self):
+        with self.assertLogs('pyardrone.video', 'WARNING'):
+            self.assertEqual(list(self.decoder.decode(b'')), [])
+        self.assertEqual(list(self.decoder.decode(b'\x03')), [
+            ('ndarray', 'bgr24', 3)])
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_decode_into_pool(self):
+        pool = FramePool(3)
+        images = []
+        for image in self.decoder.decode(b'\x01\x02\x03', pool):
+            # a copy, the buffers are reused
+            images.append(image.copy())
+            pool.publish(image)
+        self.assertEqual(len(images), 3)
+        for value, image in enumerate(images, 1):
+            self.assertEqual(image.shape, (2, 4, 3))
+            # without the padding of the rows
+            self.assertTrue((image == value).all())
+        self.assertTrue((pool.latest == 3).all())
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_frames_of_a_payload_get_their_own_buffers(self):
+        pool = FramePool(3)
+        client = RelayVideoClient('127.0.0.1', 0)
+        client.frame_pool = pool
+        frames = client.subscribe_frames(maxsize=3)
+        client._decode(
+            self.decoder, pave.Frame(make_header(1), b'\x01\x02'))
+        first, second = frames.get(0), frames.get(0)
+        self.assertIsNot(first.image, second.image)
+        self.assertTrue((first.image == 1).all())
+        self.assertTrue((second.image == 2).all())
+        frames.close()
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_queued_frames_hold_their_buffers(self):
+        pool = FramePool(4)
+        client = RelayVideoClient('127.0.0.1', 0)
+        client.frame_pool = pool
+        frames = client.subscribe_frames(maxsize=3)
+        client._decode(
+            self.decoder, pave.Frame(make_header(1), b'\x01\x02\x03\x04\x05'))
+        self.assertEqual(frames.dropped, 2)
+        self.assertEqual(pool.exhausted, 0)
+        for value in (3, 4, 5):
+            self.assertTrue((frames.get(0).image == value).all())
+        # released once returned
+        self.assertEqual(list(pool._holds), [])
+        frames.close()
+
+    @unittest.skipUnless(NUMPY, 'requires numpy')
+    def test_closed_subscription_releases_its_buffers(self):
+        pool = FramePool(3)
+        client = RelayVideoClient('127.0.0.1', 0)
+        client.frame_pool = pool
+        frames = client.subscribe_frames(maxsize=3)
+        client._decode(
+            self.decoder, pave.Frame(make_header(1), b'\x01\x02\x03'))
+        # the queue holds every buffer
+        self.assertIsNone(pool.writable((2, 4, 3)))
+        frames.close()
+        self.assertEqual(list(pool._holds), [])
+        self.assertIsNotNone(pool.writable((2, 4, 3)))
+
+
+class LatencyBoundedQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.queue = LatencyBoundedQueue(0.1, clock=self.clock)
+
+    def put(self, frame_number, keyframe=False):
+        # 30 fps, received 10 ms after being timestamped
+        timestamp = frame_number * 33
+        self.clock.time = timestamp / 1000 + 0.01
+        self.queue.put(pave.Frame(make_header(
+            frame_number,
+            timestamp=timestamp,
+            frame_type=(
+                pave.FRAME_TYPE_I_FRAME if keyframe
+                else pave.FRAME_TYPE_P_FRAME),
+        ), b''))
+
+    def get_numbers(self, count):
+        return [self.queue.get().frame_number for _ in range(count)]
+
+    def test_in_time(self):
+        for frame_number in range(5):
+            self.put(frame_number, keyframe=frame_number == 0)
+        self.assertEqual(self.get_numbers(5), [0, 1, 2, 3, 4])
+        self.assertEqual(self.queue.dropped, 0)
+        self.assertEqual(self.queue.latency.count, 5)
+        self.assertLess(self.queue.latency.max, 0.15)
+
+    def test_skip_to_keyframe(self):
+        for frame_number in range(10):
+            self.put(frame_number, keyframe=frame_number in (0, 6))
+        # frames 0 to 5 are late by more than 100 ms
+        self.assertEqual(self.get_numbers(4), [6, 7, 8, 9])
+        self.assertEqual(self.queue.dropped, 6)
+
+    def test_wait_for_keyframe(self):
+        for frame_number in range(1, 6):
+            self.put(frame_number)
+        self.clock.time += 1
+        result = []
+        thread = threading.Thread(target=lambda: result.append(
+            self.queue.get().frame_number))
+        thread.start()
+        # frames 1 to 5 are dropped, and so is frame 6
+        self.put(6)
+        self.put(7, keyframe=True)
+        thread.join(1)
+        self.assertEqual(result, [7])
+        self.assertEqual(self.queue.dropped, 6)
+
+    def test_close(self):
+        self.queue.close()
+        self.assertIsNone(self.queue.get())
+
+
+@unittest.skipUnless(NUMPY, 'requires numpy')
+class FramePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = FramePool(3)
+
+    def produce(self, value, shape=(2, 2, 3)):
+        buffer = self.pool.writable(shape)
+        if buffer is not None:
+            buffer[...] = value
+            self.pool.publish(buffer)
+        return buffer
+
+    def test_buffers_are_reused(self):
+        buffers = [id(self.produce(i)) for i in range(10)]
+        # least recently published first
+        self.assertEqual(len(set(buffers)), 3)
+        self.assertEqual(buffers[3:], buffers[:-3])
+        self.assertEqual(self.pool.latest[0, 0, 0], 9)
+
+    def test_hold(self):
+        held = self.produce(1)
+        self.pool.hold(held)
+        self.pool.hold(held)
+        for i in range(2, 10):
+            self.assertIsNot(self.produce(i), held)
+        self.pool.release(held)
+        self.assertTrue((held == 1).all())
+        self.pool.release(held)
+        self.assertIn(
+            id(held), [id(self.produce(i)) for i in range(10, 13)])
+
+    def test_held_frame_is_stable(self):
+        self.produce(1)
+        with self.pool.acquire() as frame:
+            for i in range(2, 10):
+                self.assertIsNot(self.produce(i), frame)
+            self.assertTrue((frame == 1).all())
+        self.assertEqual(self.pool.exhausted, 0)
+
+    def test_exhausted(self):
+        with contextlib.ExitStack() as stack:
+            frames = []
+            for i in range(2):
+                self.produce(i)
+                frames.append(stack.enter_context(self.pool.acquire()))
+            self.produce(2)
+            self.assertIsNone(self.pool.writable((2, 2, 3)))
+            self.assertEqual(self.pool.exhausted, 1)
+        self.assertIsNotNone(self.pool.writable((2, 2, 3)))
+
+    def test_shape_change(self):
+        self.produce(1)
+        with self.pool.acquire() as frame:
+            self.produce(2, shape=(4, 4, 3))
+            self.assertEqual(self.pool.latest.shape, (4, 4, 3))
+            self.assertTrue((frame == 1).all())
+
+    def test_acquire_nothing(self):
+        with self.pool.acquire() as frame:
+            self.assertIsNone(frame)
+
+
+class RelayVideoClient(VideoClient):
+
+    '''
+    A relay client which does not read the relayed stream with opencv.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        with mock.patch.object(video, 'OPENCV', True):
+            super().__init__(*args, decoder='relay', **kwargs)
+        self.pave_frames = []
+
+    def _video_opencv_job(self):
+        pass
+
+    def pave_frame_received(self, frame):
+        self.pave_frames.append(frame)
+
+
+class VideoClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        self.server.settimeout(1)
+        self.host, self.port = self.server.getsockname()
+
+    def tearDown(self):
+        self.server.close()
+
+    @unittest.skipIf(video.AV, 'PyAV is installed')
+    def test_av_is_required(self):
+        with self.assertRaises(RuntimeError):
+            VideoClient(self.host, self.port, decoder='av')
+
+    def test_max_latency_requires_av(self):
+        with self.assertRaises(ValueError):
+            with mock.patch.object(video, 'OPENCV', True):
+                VideoClient(
+                    self.host, self.port, decoder='relay', max_latency=0.1)
+
+    def test_unknown_decoder(self):
+        with self.assertRaises(ValueError):
+            VideoClient(self.host, self.port, decoder='gstreamer')
+
+    def test_relay(self):
+        relay = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        relay.bind(('localhost', 0))
+        relay.settimeout(1)
+        client = RelayVideoClient(
+            self.host, self.port, redirect_port=relay.getsockname()[1])
+        client.redirect_chunk_size = 8
+        client.connect()
+        conn, _ = self.server.accept()
+        stream = make_frame(1, b'0123456789') + make_frame(2, b'abc')
+        # split inside the second header
+        conn.sendall(stream[:len(stream) - 20])
+        conn.sendall(stream[len(stream) - 20:])
+        received = b''.join(relay.recv(4096) for _ in range(3))
+        self.assertEqual(received, b'0123456789abc')
+        self.assertEqual(
+            [frame.frame_number for frame in client.pave_frames], [1, 2])
+        conn.close()
+        client._video_client_thread.join(1)
+        self.assertFalse(client._video_client_thread.is_alive())
+        client.close()
+        relay.close()
+
+
+class FrameNotificationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = RelayVideoClient('127.0.0.1', 0)
+        self.header = make_header(7)
+
+    def test_wait_next_frame(self):
+        timer = threading.Timer(
+            0.05, self.client.frame_recieved, ('image', self.header))
+        timer.start()
+        frame = self.client.wait_next_frame(1)
+        timer.join()
+        self.assertEqual(frame.image, 'image')
+        self.assertEqual(frame.header.frame_number, 7)
+
+    def test_wait_next_frame_matches_header(self):
+        frames = []
+        waiter = threading.Thread(
+            target=lambda: frames.append(self.client.wait_next_frame(1)))
+        waiter.start()
+        frame_number = 0
+        while waiter.is_alive():
+            frame_number += 1
+            self.client.frame_recieved(frame_number, make_header(frame_number))
+        self.assertEqual(frames[0].image, frames[0].header.frame_number)
+
+    def test_wait_next_frame_timeout(self):
+        self.client.frame_recieved('old')
+        self.assertIsNone(self.client.wait_next_frame(0.01))
+
+    def test_wait_next_frame_closed(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        server.settimeout(1)
+        client = RelayVideoClient(*server.getsockname())
+        client.connect()
+        conn, _ = server.accept()
+        timer = threading.Timer(0.05, client.close)
+        timer.start()
+        with self.assertRaises(RuntimeError):
+            client.wait_next_frame(1)
+        timer.join()
+        conn.close()
+        server.close()
+
+    def test_drop_oldest(self):
+        with self.client.subscribe_frames(maxsize=2) as frames:
+            for image in range(5):
+                self.client.frame_recieved(image, self.header)
+            self.assertEqual(frames.dropped, 3)
+            self.assertEqual(frames.get(0).image, 3)
+            self.assertEqual(frames.get(0).image, 4)
+            self.assertIsNone(frames.get(0.01))
+
+    def test_each_subscriber_gets_each_frame(self):
+        first = self.client.subscribe_frames()
+        second = self.client.subscribe_frames()
+        self.client.frame_recieved('image', self.header)
+        self.assertEqual(first.get(0).image, 'image')
+        self.assertEqual(second.get(0).image, 'image')
+        first.close()
+        self.client.frame_recieved('next', self.header)
+        self.assertEqual(len(first), 0)
+        self.assertEqual(second.get(0).image, 'next')
+        second.close()
+
+    def test_iterate_until_closed(self):
+        frames = self.client.subscribe_frames(maxsize=3)
+        for image in range(3):
+            self.client.frame_recieved(image)
+        received = []
+        for frame in frames:
+            received.append(frame.image)
+            self.assertIsNone(frame.header)
+            if frame.image == 2:
+                threading.Timer(0.05, frames.close).start()
+        self.assertEqual(received, [0, 1, 2])
+
+
+class AsyncFrameIteratorTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.client = RelayVideoClient('127.0.0.1', 0)
+        self.frames = self.client.subscribe_frames(maxsize=3)
+
+    def tearDown(self):
+        self.frames.close()
+
+    def produce(self):
+        for image in range(3):
+            self.client.frame_recieved(image)
+
+    async def test_async_iteration(self):
+        timer = threading.Timer(0.05, self.produce)
+        timer.start()
+        received = []
+        async for frame in self.frames:
+            received.append(frame.image)
+            if len(received) == 3:
+                break
+        timer.join()
+        self.assertEqual(received, [0, 1, 2])
+
+    async def test_stops_when_closed(self):
+        timer = threading.Timer(0.05, self.frames.close)
+        timer.start()
+        async for frame in self.frames:
+            self.fail('received {!r}'.format(frame))
+        timer.join()
+        self.assertEqual(self.frames._wakers, ())